@@ -0,0 +1,154 @@
+"""Vectorized Snappy Bird simulation: N birds stepped together with NumPy."""
+import math
+import random
+
+import numpy as np
+
+from engine import (PipeCourse, bird_start, difficulty_increase_interval, flap_velocity,
+                    gravity, ground_y, pipe_interval, screen_width, start_scroll_speed,
+                    terminal_velocity)
+
+
+class BatchEngine():
+    """Runs n independent copies of FlappyEngine in lockstep.
+
+    Every bird flies the same PipeCourse: its j-th pipe has the j-th gap
+    center drawn from the shared RNG, exactly as a single FlappyEngine seeded
+    the same way would draw it. Gap size, scroll speed and pipe positions follow
+    each bird's own score and launch tick, so bird i matches a FlappyEngine
+    (with the default rectangle hitboxes) fed the same flaps step for step.
+    """
+    def __init__(self, n, bird_size=(51, 36), pipe_size=(78, 560), rng=None):
+        self.n = n
+        self.bird_width, self.bird_height = bird_size
+        self.pipe_width, self.pipe_height = pipe_size
+        self.rng = rng if rng is not None else random
+        # Pipes live for (screen_width + pipe_width) / scroll_speed ticks and spawn every pipe_interval
+        self.capacity = math.ceil((screen_width + self.pipe_width) / (start_scroll_speed * pipe_interval)) + 1
+        self.reset()
+
+    def reset(self):
+        n, k = self.n, self.capacity
+        self.tick = np.zeros(n, dtype=np.int32)
+        self.bird_x = bird_start[0] - self.bird_width // 2
+        self.y = np.full(n, bird_start[1] - self.bird_height // 2, dtype=np.int32)
+        self.vel = np.zeros(n, dtype=np.float32)  # Always a multiple of 0.5, so float32 is exact
+        self.flying = np.zeros(n, dtype=bool)
+        self.alive = np.ones(n, dtype=bool)
+        self.score = np.zeros(n, dtype=np.int32)
+        self.pass_pipe = np.zeros(n, dtype=bool)
+        self.next_spawn_tick = np.zeros(n, dtype=np.int32)
+        self.spawned = np.zeros(n, dtype=np.int32)
+        # Slot-major pipe arrays: row j holds every bird's j-th oldest pipe, count says how many are live
+        self.pipe_x = np.zeros((k, n), dtype=np.int32)
+        self.pipe_center = np.zeros((k, n), dtype=np.int32)
+        self.pipe_gap = np.zeros((k, n), dtype=np.int32)
+        self.count = np.zeros(n, dtype=np.int32)
+        self.course = PipeCourse(self.rng)
+        self.centers = np.zeros(0, dtype=np.int32)
+        # The difficulty profile as lookup arrays, with speeds in half pixels so they stay integers
+        self.profile_speed2 = np.array([int(2 * speed) for speed, _ in self.course.profile], dtype=np.int32)
+        self.profile_gap = np.array([gap for _, gap in self.course.profile], dtype=np.int32)
+        # Each bird's current difficulty, looked up again only when its score changes
+        self.scroll_speed2 = np.full(n, self.profile_speed2[0], dtype=np.int32)
+        self.gap = np.full(n, self.profile_gap[0], dtype=np.int32)
+
+    def course_centers(self, needed):
+        """Gap centers of the shared course as an array, drawn from the course on demand"""
+        if needed > len(self.centers):
+            self.course.center(needed - 1)
+            self.centers = np.array(self.course.centers, dtype=np.int32)
+        return self.centers
+
+    def hit_pipe(self):
+        bird_top = self.y
+        bird_bottom = bird_top + self.bird_height
+        hit = np.zeros(self.n, dtype=bool)
+        # One slot at a time keeps every operation on contiguous length-n rows
+        for j in range(self.capacity):
+            x = self.pipe_x[j]
+            half = self.pipe_gap[j] >> 1
+            top_pipe_bottom = self.pipe_center[j] - half
+            bottom_pipe_top = self.pipe_center[j] + half
+            overlap_x = (self.bird_x < x + self.pipe_width) & (x < self.bird_x + self.bird_width)
+            hit_top = (bird_top < top_pipe_bottom) & (top_pipe_bottom - self.pipe_height < bird_bottom)
+            hit_bottom = (bird_top < bottom_pipe_top + self.pipe_height) & (bottom_pipe_top < bird_bottom)
+            hit |= (self.count > j) & overlap_x & (hit_top | hit_bottom)
+        return hit
+
+    def step(self, flap):
+        """Advance every live bird by one tick; flap is a bool array of length n"""
+        flap = np.asarray(flap, dtype=bool) & self.alive
+        np.copyto(self.next_spawn_tick, self.tick, where=flap & ~self.flying)
+        self.flying |= flap
+
+        # Bird physics; vel never exceeds terminal velocity, so the cap is safe for resting birds too
+        moving = self.flying & self.alive
+        np.minimum(self.vel + gravity * moving, terminal_velocity, out=self.vel)
+        falling = moving & (self.y + self.bird_height < ground_y)
+        self.y += self.vel.astype(np.int32) * falling  # astype truncates toward zero like int()
+        np.copyto(self.vel, flap_velocity, where=flap)
+
+        # Collision
+        crashed = self.alive & (self.hit_pipe() | (self.y < 0))
+        grounded = self.alive & (self.y + self.bird_height >= ground_y)
+        self.flying &= ~grounded
+        self.alive &= ~(crashed | grounded)
+        alive = self.alive
+
+        # Scoring against the oldest pipe
+        has_pipe = alive & (self.count > 0)
+        first_x = self.pipe_x[0]
+        entered = (has_pipe & (self.bird_x > first_x) &
+                   (self.bird_x + self.bird_width < first_x + self.pipe_width) & ~self.pass_pipe)
+        self.pass_pipe |= entered
+        cleared = has_pipe & self.pass_pipe & (self.bird_x > first_x + self.pipe_width)
+        self.score += cleared
+        self.pass_pipe &= ~cleared
+
+        # Spawn, scroll and retire pipes
+        flying = alive & self.flying
+        spawn = flying & (self.tick >= self.next_spawn_tick)
+        if spawn.any():
+            centers = self.course_centers(int(self.spawned[spawn].max()) + 1)
+            new_center = centers[np.minimum(self.spawned, len(centers) - 1)]
+            for j in range(self.capacity):
+                slot = spawn & (self.count == j)
+                np.copyto(self.pipe_x[j], screen_width, where=slot)
+                np.copyto(self.pipe_center[j], new_center, where=slot)
+                np.copyto(self.pipe_gap[j], self.gap, where=slot)
+            self.count += spawn
+            self.spawned += spawn
+            self.next_spawn_tick += spawn * pipe_interval
+        for j in range(self.capacity):
+            scrolling = flying & (self.count > j)
+            if not scrolling.any():
+                break
+            # round_position(x - speed) with the speed in half pixels, in integer math
+            d = 2 * self.pipe_x[j] - self.scroll_speed2
+            moved = np.where(d >= 0, (d + 1) >> 1, -((1 - d) >> 1))
+            np.copyto(self.pipe_x[j], moved, where=scrolling)
+        retired = flying & (self.count > 0) & (self.pipe_x[0] + self.pipe_width < 0)
+        if retired.any():
+            for j in range(self.capacity - 1):
+                for column in (self.pipe_x, self.pipe_center, self.pipe_gap):
+                    np.copyto(column[j], column[j + 1], where=retired)
+            self.count -= retired
+
+        # New points raise the difficulty from the next tick on
+        if cleared.any():
+            scorers = cleared.nonzero()[0]
+            level = np.minimum(self.score[scorers] // difficulty_increase_interval, len(self.profile_gap) - 1)
+            self.scroll_speed2[scorers] = self.profile_speed2[level]
+            self.gap[scorers] = self.profile_gap[level]
+
+        self.tick += alive
+        return alive
+
+    def run(self, policy, max_ticks):
+        """Step until every bird is dead or max_ticks, asking policy(batch) for the flap array"""
+        for _ in range(max_ticks):
+            if not self.alive.any():
+                break
+            self.step(policy(self))
+        return self.score
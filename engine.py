@@ -0,0 +1,300 @@
+"""Headless Snappy Bird simulation, advanced one tick at a time with step(flap)."""
+import math
+import random
+from collections import namedtuple
+
+screen_width = 864
+screen_height = 936
+ground_y = 768  # Top of the ground strip; touching it ends the run
+fps = 60  # Ticks per second of game time
+
+# Bird physics
+bird_start = (100, int(screen_height / 2))
+gravity = 0.5
+terminal_velocity = 8
+flap_velocity = -10
+
+# Pipes and difficulty
+pipe_interval = 90  # Ticks between pipe spawns (1500 ms at 60 fps)
+pipe_height_range = 100  # Gap centers are offset by randint(-100, 100) from mid-screen
+start_scroll_speed = 4
+max_scroll_speed = 7
+start_pipe_gap = 180
+min_pipe_gap = 120
+difficulty_increase_interval = 5  # Increase difficulty every 5 points
+ground_scroll_wrap = 35
+anim_interval = 6  # Ticks per bird animation frame
+
+
+def build_difficulty_profile():
+    """(scroll speed, pipe gap) for each difficulty level, up to the first level where both are capped"""
+    profile = []
+    level = 0
+    while True:
+        scroll_speed = min(start_scroll_speed + (level * 0.5), max_scroll_speed)
+        pipe_gap = int(max(start_pipe_gap - (level * 10), min_pipe_gap))
+        profile.append((scroll_speed, pipe_gap))
+        if scroll_speed == max_scroll_speed and pipe_gap == min_pipe_gap:
+            return profile
+        level += 1
+
+
+difficulty_profile = build_difficulty_profile()
+
+# One pipe pair of a course: spawn_tick counts from the tick the bird launched. Every
+# live pipe scrolls at the engine's current speed, so a pipe does not carry its own
+PipeSpec = namedtuple("PipeSpec", "spawn_tick center gap")
+
+
+def round_position(value):
+    """Round a coordinate the way pygame.Rect does (half away from zero)"""
+    if value >= 0:
+        return int(value + 0.5)
+    return -int(-value + 0.5)
+
+
+def anim_frame(tick, frame_count):
+    """Bird animation frame shown (and hit-tested) on a given tick"""
+    return (tick // anim_interval) % frame_count
+
+
+def rects_overlap(a, b):
+    """Same test as pygame.Rect.colliderect for (x, y, w, h) tuples"""
+    return (a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and
+            a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+
+
+class PipeStore():
+    """Fixed-capacity ring buffer of pipe pairs kept as parallel arrays, oldest first.
+
+    Slots are reused as pipes scroll off, so a long session allocates nothing
+    per spawn. Iterate live pipes with slots(); each slot holds a top and a
+    bottom pipe sharing the same left edge.
+    """
+    def __init__(self, capacity, width, height):
+        self.capacity = capacity
+        self.width = width
+        self.height = height
+        self.x = [0] * capacity
+        self.prev_x = [0] * capacity  # x before the last scroll, for render interpolation
+        self.center = [0] * capacity
+        self.gap = [0] * capacity
+        self.entered = [False] * capacity  # The bird has been fully inside this pipe's column
+        self.scored = [False] * capacity
+        self.clear()
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def slot(self, index):
+        """Slot of the index-th oldest live pipe"""
+        return (self.head + index) % self.capacity
+
+    def slots(self):
+        for index in range(self.count):
+            yield (self.head + index) % self.capacity
+
+    def push(self, x, center, gap):
+        if self.count == self.capacity:
+            raise RuntimeError("Pipe store is full")
+        slot = (self.head + self.count) % self.capacity
+        self.x[slot] = self.prev_x[slot] = x
+        self.center[slot] = center
+        self.gap[slot] = gap
+        self.entered[slot] = False
+        self.scored[slot] = False
+        self.count += 1
+        return slot
+
+    def pop_oldest(self):
+        self.head = (self.head + 1) % self.capacity
+        self.count -= 1
+
+    def top_rect(self, slot):
+        return (self.x[slot], self.center[slot] - int(self.gap[slot] / 2) - self.height, self.width, self.height)
+
+    def bottom_rect(self, slot):
+        return (self.x[slot], self.center[slot] + int(self.gap[slot] / 2), self.width, self.height)
+
+    def first_right_of(self, left):
+        """Index of the oldest pipe with x > left, by binary search (pipes are sorted by x)"""
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self.x[(self.head + mid) % self.capacity] > left:
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+
+class PipeCourse():
+    """The pipe layout of one run, generated lazily from an RNG.
+
+    Gap centers are drawn the first time each pipe is asked for, so any number
+    of engines can share a course and see the same pipes in the same order.
+    Gap size and scroll speed come from the difficulty profile: a pipe spawns
+    with the gap of the level the bird has reached when it appears, and the
+    engine scrolls every pipe at the speed of the current level.
+    """
+    def __init__(self, rng=None, profile=difficulty_profile):
+        self.rng = rng if rng is not None else random
+        self.profile = profile
+        self.centers = []
+
+    def center(self, index):
+        while len(self.centers) <= index:
+            self.centers.append(int(screen_height / 2) + self.rng.randint(-pipe_height_range, pipe_height_range))
+        return self.centers[index]
+
+    def difficulty(self, level):
+        """(scroll speed, pipe gap) at a difficulty level"""
+        return self.profile[min(level, len(self.profile) - 1)]
+
+    def spawn_tick(self, index):
+        return index * pipe_interval
+
+    def pipe(self, index, level=0):
+        """The index-th pipe, with the gap of the difficulty level it spawns at"""
+        return PipeSpec(self.spawn_tick(index), self.center(index), self.difficulty(level)[1])
+
+
+class FlappyEngine():
+    """Physics, pipe spawning, scoring and collision for a single bird.
+
+    collider, if given, is called as collider(engine, slot) for pipes
+    overlapping the bird's column and replaces the plain rectangle test.
+    """
+    def __init__(self, bird_size=(51, 36), pipe_size=(78, 560), rng=None, collider=None):
+        self.bird_width, self.bird_height = bird_size
+        self.pipe_width, self.pipe_height = pipe_size
+        self.rng = rng if rng is not None else random
+        self.collider = collider
+        # Pipes live for (screen_width + pipe_width) / scroll_speed ticks and spawn every pipe_interval
+        capacity = math.ceil((screen_width + self.pipe_width) / (start_scroll_speed * pipe_interval)) + 1
+        self.pipes = PipeStore(capacity, self.pipe_width, self.pipe_height)
+        self.seed = None
+        self.reset()
+
+    def reset(self, seed=None):
+        """Start a new run; a seed gives the run its own RNG so it can be replayed"""
+        if seed is not None:
+            self.seed = seed
+            self.rng = random.Random(seed)
+        self.tick = 0
+        self.bird_x = bird_start[0] - self.bird_width // 2
+        self.bird_y = bird_start[1] - self.bird_height // 2
+        self.vel = 0
+        self.flying = False
+        self.game_over = False
+        self.score = 0
+        self.pipes.clear()
+        self.course = PipeCourse(self.rng)
+        self.spawned = 0
+        self.launch_tick = 0
+        self.level = 0
+        self.scroll_speed, self.pipe_gap = self.course.difficulty(0)
+        self.ground_scroll = 0
+
+    def bird_rect(self):
+        return (self.bird_x, self.bird_y, self.bird_width, self.bird_height)
+
+    def update_difficulty(self):
+        self.level = self.score // difficulty_increase_interval
+        self.scroll_speed, self.pipe_gap = self.course.difficulty(self.level)
+
+    def pipes_near_bird(self):
+        """Slots of pipes overlapping the bird's column. Spawning adds at the right
+        edge and all pipes scroll together, so the store is always sorted by x."""
+        pipes = self.pipes
+        index = pipes.first_right_of(self.bird_x - self.pipe_width)
+        bird_right = self.bird_x + self.bird_width
+        while index < pipes.count:
+            slot = pipes.slot(index)
+            if pipes.x[slot] >= bird_right:
+                break
+            yield slot
+            index += 1
+
+    def hit_pipe(self):
+        bird = self.bird_rect()
+        for slot in self.pipes_near_bird():
+            if self.collider is not None:
+                if self.collider(self, slot):
+                    return True
+            elif rects_overlap(bird, self.pipes.top_rect(slot)) or rects_overlap(bird, self.pipes.bottom_rect(slot)):
+                return True
+        return False
+
+    def spawn_pipe(self):
+        spec = self.course.pipe(self.spawned, self.level)
+        self.pipes.push(screen_width, spec.center, spec.gap)
+        self.spawned += 1
+
+    def step(self, flap=False):
+        """Advance the game by one tick. Returns False once the run is over."""
+        if self.game_over:
+            return False
+        # The first flap launches the bird
+        if flap and not self.flying:
+            self.flying = True
+            self.launch_tick = self.tick
+
+        # Gravity is applied before the flap, so a flap takes effect on the next tick
+        if self.flying:
+            self.vel += gravity
+            if self.vel > terminal_velocity:
+                self.vel = terminal_velocity
+            if self.bird_y + self.bird_height < ground_y:
+                self.bird_y += int(self.vel)
+        if flap:
+            self.vel = flap_velocity
+
+        if self.hit_pipe() or self.bird_y < 0:
+            self.game_over = True
+        if self.bird_y + self.bird_height >= ground_y:
+            self.game_over = True
+            self.flying = False
+        if self.game_over:
+            return False
+
+        pipes = self.pipes
+        scored = False
+        if pipes.count:
+            # A point is scored once the bird has been inside the oldest pipe and left it
+            first = pipes.head
+            pipe_left = pipes.x[first]
+            pipe_right = pipe_left + pipes.width
+            if self.bird_x > pipe_left and self.bird_x + self.bird_width < pipe_right and not pipes.scored[first]:
+                pipes.entered[first] = True
+            if pipes.entered[first] and not pipes.scored[first] and self.bird_x > pipe_right:
+                self.score += 1
+                pipes.scored[first] = True
+                scored = True
+
+        if self.flying:
+            if self.tick - self.launch_tick >= self.course.spawn_tick(self.spawned):
+                self.spawn_pipe()
+            for slot in pipes.slots():
+                pipes.prev_x[slot] = pipes.x[slot]
+                pipes.x[slot] = round_position(pipes.x[slot] - self.scroll_speed)
+            while pipes.count and pipes.x[pipes.head] + pipes.width < 0:
+                pipes.pop_oldest()
+            self.ground_scroll -= self.scroll_speed
+            if abs(self.ground_scroll) > ground_scroll_wrap:
+                self.ground_scroll = 0
+        # A new point raises the difficulty from the next tick on
+        if scored:
+            self.update_difficulty()
+        self.tick += 1
+        return True
+
+    def run(self, policy, max_ticks=None):
+        """Step until game over, asking policy(engine) whether to flap each tick"""
+        while not self.game_over and (max_ticks is None or self.tick < max_ticks):
+            self.step(policy(self))
+        return self.score
@@ -0,0 +1,61 @@
+"""Crash-safe file writes shared by the score store, the raster cache and svgutility."""
+import os
+import queue
+import threading
+
+
+def write_atomic(path, data):
+    """
+    Replace path with data (bytes) so that, even after a crash or power loss,
+    it holds either its old contents or all of the new ones.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+    # Make the rename itself durable; directories cannot be opened for this on Windows
+    try:
+        directory_fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(directory_fd)
+    finally:
+        os.close(directory_fd)
+
+
+class FileWriter():
+    """Writes files on a background thread, each one with write_atomic.
+
+    write() only queues the data, so callers on the render thread never wait
+    for the disk. close() writes whatever is still queued and stops the thread.
+    """
+    def __init__(self, name="file-writer"):
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name=name, daemon=True)
+        self.thread.start()
+
+    def write(self, path, data):
+        """Replace a file with data (bytes) once the writer thread gets to it"""
+        self.queue.put((path, data))
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            path, data = item
+            try:
+                write_atomic(path, data)
+            except OSError as e:
+                print(f"Error writing {path}: {e}")
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
@@ -1,21 +1,44 @@
 import pygame
 from pygame.locals import *
-import random
 import os
+import atexit
 import json
+from collections import OrderedDict
+from engine import FlappyEngine, anim_frame, ground_y, fps as tick_rate
+from hitmask import MaskCollider
+from replay import Replay, hitbox_mask
+from scores import ScoreWriter, open_store
+from leaderboard import Leaderboard
+from leaderboard_service import LeaderboardClient
+from raster_cache import RasterCache
+from fileio import FileWriter
+from sprite_sizes import start_size, theme_preview_size, trophy_size
 
 pygame.init()
 
 clock = pygame.time.Clock()
-fps = 60
+fps = 60  # Render frame rate; physics always runs at tick_rate ticks per second
+tick_ms = 1000 / tick_rate
+max_frame_ms = 250  # Longest frame the simulation will catch up on
+accumulator = 0.0  # Simulation time owed to the engine, in milliseconds
+pending_flap = False  # A click waiting for the next simulation tick
 screen_width = 864
 screen_height = 936
 screen = pygame.display.set_mode((screen_width, screen_height))
 pygame.display.set_caption('Flappy Bird')
-font = pygame.font.Font("Jersey10-Regular.ttf", 60)
-small_font = pygame.font.Font("Jersey10-Regular.ttf", 40)
-smaller_font = pygame.font.Font("Jersey10-Regular.ttf", 30)
-tiny_font = pygame.font.Font("Jersey10-Regular.ttf", 25)
+
+# Fonts are created once per size and shared
+font_cache = {}
+
+def get_font(size):
+    if size not in font_cache:
+        font_cache[size] = pygame.font.Font("Jersey10-Regular.ttf", size)
+    return font_cache[size]
+
+font = get_font(60)
+small_font = get_font(40)
+smaller_font = get_font(30)
+tiny_font = get_font(25)
 white = (255, 255, 255)
 orange = (255, 102, 0)
 dark_green = (34, 139, 34)
@@ -29,7 +52,9 @@ themes = [
 
 # User Management Variables
 current_user = ""
-users_data = {}
+leaderboard = None  # Leaderboard index over every user, loaded from the score store
+user_search = ""  # Name prefix typed on the user page
+user_page_size = 3  # Rows visible in the user table
 showing_user_page = False
 create_user_active = False
 new_username = ""
@@ -40,23 +65,18 @@ current_theme = 0
 bird_types = ["bird", "rocket"]
 current_bird_type = 0
 
+# Mirrors of the engine state used by the menus and screens
 ground_scroll = 0
-scroll_speed = 4  # Starting speed
+prev_ground_scroll = 0
 flying = False
 game_over = False
-pipe_gap = 180  # Starting with easier gap
-pipe_frequency = 1500  # milliseconds
-last_pipe = pygame.time.get_ticks() - pipe_frequency
 score = 0
-pass_pipe = False
+mouse_held = False  # Left button state last frame, so a held click only flaps once
 game_started = False  # New variable to track if game has started
 welcome_screen = True  # New variable for welcome screen
 
 showing_bird_selection = False
 showing_theme_selection = False
-difficulty_increase_interval = 5  # Increase difficulty every 5 points
-max_scroll_speed = 7
-min_pipe_gap = 120
 
 high_score_updated = False
 
@@ -65,73 +85,156 @@ bird_frames = ["img/bird_up.svg", "img/bird_mid.svg", "img/bird_down.svg"]  # Bi
 selected_bird_index = 0  # To allow bird selection/changing
 show_game_manual = True  # Show game manual at start
 game_over_screen = False  # Track if game over screen is showing
-
-# Load User Data
-def load_users_data():
-    if os.path.exists('users_data.json'):
-        with open('users_data.json', 'r') as file:
-            try:
-                return json.load(file)
-            except:
-                return {}
-    return {}
-
-# Save User Data
-def save_users_data():
-    with open('users_data.json', 'w') as file:
-        json.dump(users_data, file)
+dirty_rect_mode = False  # Opt-in: during gameplay only push changed rectangles to the display
+needs_full_repaint = True  # Set whenever a frame was drawn outside the dirty-rect renderer
+
+# Sprite frame registry: each image file is rasterized once and kept in memory
+sprite_cache = {}
+bird_skin_frames = {}
+
+class SpriteAtlas():
+    """
+    Game images packed into one surface by `python svgutility.py atlas`.
+    The atlas is decoded once and every sprite is a subsurface of it. Sprites
+    whose SVG changed since the atlas was built are left out, so callers fall
+    back to rasterizing those files.
+    """
+    def __init__(self, index_path, content_hash):
+        self.directory = os.path.dirname(index_path)
+        self.image = None
+        self.rects = {}
+        self.sizes = {}
+        try:
+            with open(index_path, 'r') as file:
+                index = json.load(file)
+            image = pygame.image.load(os.path.join(self.directory, index["image"])).convert_alpha()
+            current = set()
+            for name, digest in index["sources"].items():
+                try:
+                    if content_hash(os.path.join(self.directory, name)) == digest:
+                        current.add(name)
+                except OSError:
+                    pass
+        except (OSError, ValueError, KeyError, pygame.error):
+            return
+        self.image = image
+        self.rects = {key: pygame.Rect(rect) for key, rect in index["sprites"].items()
+                      if key.split("@")[0] in current}
+        self.sizes = {name: tuple(size) for name, size in index["sizes"].items() if name in current}
+
+    def key(self, filename, size=None):
+        name = os.path.relpath(filename, self.directory).replace(os.sep, "/")
+        return f"{name}@{size[0]}x{size[1]}" if size else name
+
+    def get(self, filename, size=None):
+        """Subsurface for an image file at size (w, h) or its native size, or None if it is not packed"""
+        rect = self.rects.get(self.key(filename, size))
+        return self.image.subsurface(rect) if rect else None
+
+    def image_size(self, filename):
+        """Native size of an image file, or None if the atlas does not know it"""
+        return self.sizes.get(self.key(filename))
+
+def load_image(filename, size=None):
+    """A Surface of an image file at size (w, h) or its native size, from the atlas when it has it"""
+    image = sprite_atlas.get(filename, size)
+    if image is None:
+        image = raster_cache.load(filename, size).convert_alpha()
+    return image
+
+def image_size(filename):
+    """Native size of an image file"""
+    return sprite_atlas.image_size(filename) or raster_cache.image_size(filename)
+
+def get_sprite(filename):
+    """Return the cached Surface for an image file, rasterizing it on first use"""
+    if filename not in sprite_cache:
+        sprite_cache[filename] = load_image(filename)
+    return sprite_cache[filename]
+
+# Scores live in a SQLite store, read once at startup; the leaderboard is its in-memory
+# index for the menus and every later write goes through the background score_writer
+score_store = open_store()
+score_writer = ScoreWriter(score_store.path)
+atexit.register(score_writer.close)  # Flush pending saves however the game exits
+
+# Optional shared leaderboard: new high scores are also sent to this server in the background
+leaderboard_address = None  # (host, port), e.g. ("127.0.0.1", 7788); None keeps scores on this machine
+leaderboard_client = LeaderboardClient(*leaderboard_address) if leaderboard_address else None
+if leaderboard_client:
+    atexit.register(leaderboard_client.close)
+
+# Rasterized SVGs are kept on disk between runs; new entries are saved by their own background writer
+raster_writer = FileWriter(name="raster-writer")
+raster_cache = RasterCache(write=raster_writer.write)
+atexit.register(raster_cache.prune)  # Entries of old SVG versions would otherwise pile up
+atexit.register(raster_writer.close)  # Runs first, so prune sees every entry this run wrote
+# When the asset build has packed the sprites, startup decodes that one image instead
+sprite_atlas = SpriteAtlas("img/atlas.json", raster_cache.content_hash)
+
+# Create a user profile
+def add_user(username):
+    score_writer.add_user(username)
+    leaderboard.add(username)
 
 # Update User's High Score
 def update_high_score(score):
-    global users_data, current_user
-    if current_user and current_user in users_data:
-        if score > users_data[current_user]["high_score"]:
-            users_data[current_user]["high_score"] = score
-            save_users_data()
+    global current_user, high_score
+    if current_user and current_user in leaderboard:
+        if score > leaderboard.score(current_user):
+            leaderboard.set_score(current_user, score)
+            high_score = max(high_score, score)
+            score_writer.submit_score(current_user, score)
+            if leaderboard_client:
+                leaderboard_client.submit(current_user, score)
             return True
     return False
 
-def load_high_score():
-    if os.path.exists('high_score.txt'):
-        with open('high_score.txt', 'r') as file:
-            try:
-                return int(file.read())
-            except:
-                return 0
-    return 0
+replay_dir = "replays"
+
+def save_run_replay():
+    """Keep the replay of a user's best run so the score can be audited later"""
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in current_user)
+    current_replay.score = game.score
+    score_writer.write_file(os.path.join(replay_dir, f"{safe_name}.rpl"), current_replay.to_bytes())
 
-def save_high_score(high_score):
-    with open('high_score.txt', 'w') as file:
-        file.write(str(high_score))
+high_score = score_store.get_high_score()
 
-high_score = load_high_score()
+# Theme surfaces are loaded once per theme and shared by everything drawing them
+theme_image_cache = {}
 
 def load_theme_images():
-    global bg, ground_img, pipe_img
+    global bg, ground_img, pipe_img, pipe_flipped_img
+    if current_theme in theme_image_cache:
+        bg, ground_img, pipe_img, pipe_flipped_img = theme_image_cache[current_theme]
+        return bg, ground_img, pipe_img, pipe_flipped_img
 
     try:
-        bg = pygame.image.load(themes[current_theme]["bg"]).convert_alpha()
+        bg = load_image(themes[current_theme]["bg"])
     except (pygame.error, FileNotFoundError):
         bg = pygame.Surface((screen_width, screen_height))
         bg.fill(themes[current_theme]["sky"])  # Use the sky color from the theme
     
 
     try:
-        ground_img = pygame.image.load(themes[current_theme]["ground"]).convert_alpha()
+        ground_img = load_image(themes[current_theme]["ground"])
     except (pygame.error, FileNotFoundError):
         ground_img = pygame.Surface((screen_width, 168))
         ground_img.fill((139, 69, 19))  # Brown
     try:
-        pipe_img = pygame.image.load(themes[current_theme]["pipe"]).convert_alpha()
+        pipe_img = load_image(themes[current_theme]["pipe"])
     except (pygame.error, FileNotFoundError):
         pipe_img = pygame.Surface((80, 500))
         pipe_img.fill((0, 128, 0))  # Green
+    # Top pipes use a single pre-flipped copy instead of flipping per Pipe
+    pipe_flipped_img = pygame.transform.flip(pipe_img, False, True)
     
-    return bg, ground_img, pipe_img
-bg, ground_img, pipe_img = load_theme_images()
+    theme_image_cache[current_theme] = (bg, ground_img, pipe_img, pipe_flipped_img)
+    return bg, ground_img, pipe_img, pipe_flipped_img
+bg, ground_img, pipe_img, pipe_flipped_img = load_theme_images()
 
 try:
-    button_img = pygame.image.load('img/restart.svg').convert_alpha()
+    button_img = load_image('img/restart.svg')
 except pygame.error:
     button_img = pygame.Surface((100, 50))
     button_img.fill((230, 97, 29))  # Orange
@@ -140,7 +243,7 @@ except pygame.error:
     restart_text = font_btn.render('RESTART', True, white)
     button_img.blit(restart_text, ((100 - restart_text.get_width())//2, (50 - restart_text.get_height())//2))
 try:
-    mainmenu_img = pygame.image.load('img/mainmenu.svg').convert_alpha()
+    mainmenu_img = load_image('img/mainmenu.svg')
 except pygame.error:
     mainmenu_img = pygame.Surface((120, 50))  # Slightly wider than restart button
     mainmenu_img.fill((0, 102, 204))  # Blue color to differentiate from restart
@@ -159,8 +262,7 @@ text_rect = back_text.get_rect(center=(40, 20))
 back_img.blit(back_text, text_rect)
 
 try:
-    start_img = pygame.image.load('img/start.svg').convert_alpha()
-    start_img = pygame.transform.scale(start_img, (int(start_img.get_width() * 0.7), int(start_img.get_height() * 0.5)))
+    start_img = load_image('img/start.svg', start_size(*image_size('img/start.svg')))
 except pygame.error:
     start_img = pygame.Surface((100, 50))
     start_img.fill((0, 128, 0))  # Green
@@ -170,14 +272,7 @@ except pygame.error:
     start_img.blit(start_text, ((100 - start_text.get_width())//2, (50 - start_text.get_height())//2))
 
 try:
-    trophy_img = pygame.image.load('img/trophy.svg').convert_alpha()
-    text_height = 43
-
-    trophy_width = trophy_img.get_width()
-    trophy_height = trophy_img.get_height()
-    new_height = text_height
-    new_width = int((trophy_width / trophy_height) * new_height)
-    trophy_img = pygame.transform.scale(trophy_img, (new_width, new_height))
+    trophy_img = load_image('img/trophy.svg', trophy_size(*image_size('img/trophy.svg')))
 except:
     trophy_surface = pygame.Surface((20, 20))  # Smaller size
     trophy_surface.fill((255, 215, 0))  # Gold color
@@ -186,26 +281,118 @@ except:
     pygame.draw.rect(trophy_surface, (255, 255, 255), (6, 17, 8, 2))
     trophy_img = trophy_surface
 
+# Cached text rendering: a glyph atlas per font plus an LRU of finished strings
+glyph_atlases = {}
+text_cache = OrderedDict()
+text_cache_size = 256
+
+class GlyphAtlas():
+    """All printable ASCII glyphs of a font rendered once into a single surface"""
+    def __init__(self, font):
+        self.height = font.get_height()
+        self.glyphs = {}
+        x = 0
+        glyph_images = []
+        for code in range(32, 127):
+            char = chr(code)
+            glyph = font.render(char, True, white)
+            self.glyphs[char] = pygame.Rect(x, 0, glyph.get_width(), self.height)
+            glyph_images.append((glyph, x))
+            x += glyph.get_width()
+        self.atlas = pygame.Surface((max(x, 1), self.height), pygame.SRCALPHA)
+        for glyph, glyph_x in glyph_images:
+            self.atlas.blit(glyph, (glyph_x, 0))
+        self.tinted = {white: self.atlas}
+
+    def render(self, text, color):
+        """Assemble text from the atlas, or return None if a glyph is missing"""
+        rects = []
+        for char in text:
+            if char not in self.glyphs:
+                return None
+            rects.append(self.glyphs[char])
+        color = tuple(color)
+        if color not in self.tinted:
+            self.tinted[color] = colorize_surface(self.atlas, color)
+        source = self.tinted[color]
+        img = pygame.Surface((max(sum(rect.width for rect in rects), 1), self.height), pygame.SRCALPHA)
+        x = 0
+        for rect in rects:
+            img.blit(source, (x, 0), rect)
+            x += rect.width
+        return img
+
+def render_text(text, font, text_col):
+    """Rendered text Surface, built from the font's glyph atlas and kept in an LRU cache"""
+    key = (font, text, tuple(text_col))
+    img = text_cache.get(key)
+    if img is not None:
+        text_cache.move_to_end(key)
+        return img
+    if font not in glyph_atlases:
+        glyph_atlases[font] = GlyphAtlas(font)
+    img = glyph_atlases[font].render(text, text_col)
+    if img is None:
+        img = font.render(text, True, text_col)
+    text_cache[key] = img
+    if len(text_cache) > text_cache_size:
+        text_cache.popitem(last=False)
+    return img
+
 def draw_text(text, font, text_col, x, y):
-    img = font.render(text, True, text_col)
+    img = render_text(text, font, text_col)
     screen.blit(img, (x, y))
 
 def draw_centered_text(text, font, text_col, y):
-    img = font.render(text, True, text_col)
+    img = render_text(text, font, text_col)
     width = img.get_width()
     x = (screen_width - width) // 2
     screen.blit(img, (x, y))
 
+# Retained UI: widgets and static screen layers are rebuilt only when their inputs change
+ui_cache = {}
+overlay_cache = {}
+
+def get_widget(name, key, build):
+    """Return the cached widget Surface for name, calling build() only when key changes"""
+    entry = ui_cache.get(name)
+    if entry is None or entry[0] != key:
+        entry = (key, build())
+        ui_cache[name] = entry
+    return entry[1]
+
+def draw_cached_layer(name, key, draw):
+    """Blit a full-screen layer, re-drawing and snapshotting it only when key changes"""
+    entry = ui_cache.get(name)
+    if entry is not None and entry[0] == key:
+        screen.blit(entry[1], (0, 0))
+        return
+    draw()
+    ui_cache[name] = (key, screen.copy())
+
+def get_overlay(alpha):
+    """Full-screen semi-transparent black overlay, built once per alpha value"""
+    if alpha not in overlay_cache:
+        overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, alpha))
+        overlay_cache[alpha] = overlay
+    return overlay_cache[alpha]
+
 def reset_game():
-    global score, flying, game_over, scroll_speed, pipe_gap, high_score_updated
-    pipe_group.empty()
-    flappy.rect.x = 100
-    flappy.rect.y = int(screen_height / 2)
+    global score, flying, game_over, ground_scroll, prev_ground_scroll, high_score_updated
+    global accumulator, pending_flap, current_replay
+    # Every run gets its own seed and input recording so it can be re-simulated
+    seed = int.from_bytes(os.urandom(8), "little")
+    game.reset(seed=seed)
+    current_replay = Replay(seed, (game.bird_width, game.bird_height), (game.pipe_width, game.pipe_height),
+                            hitbox_mask)
+    flappy.snap()
     flying = False
     game_over = False
     score = 0
-    scroll_speed = 4
-    pipe_gap = 180
+    ground_scroll = prev_ground_scroll = game.ground_scroll
+    accumulator = 0.0
+    pending_flap = False
     high_score_updated = False  # Reset the flag
     return score
 
@@ -215,14 +402,6 @@ def go_to_main_menu():
     game_over = False
     reset_game()
 
-def update_difficulty():
-    global score, scroll_speed, pipe_gap
-    difficulty_level = score // difficulty_increase_interval
-    new_scroll_speed = min(4 + (difficulty_level * 0.5), max_scroll_speed)
-    scroll_speed = new_scroll_speed
-    new_pipe_gap = max(180 - (difficulty_level * 10), min_pipe_gap)
-    pipe_gap = int(new_pipe_gap)
-
 def change_bird_type(new_type=None):
     global current_bird_type
     if new_type is not None:
@@ -232,14 +411,17 @@ def change_bird_type(new_type=None):
     flappy.load_images(bird_types[current_bird_type])
 
 def change_theme(new_theme=None):
-    global current_theme, bg, ground_img, pipe_img
+    global current_theme, bg, ground_img, pipe_img, pipe_flipped_img
     if new_theme is not None:
         current_theme = new_theme
     else:
         current_theme = (current_theme + 1) % len(themes)
-        bg, ground_img, pipe_img = load_theme_images()
-    for pipe in pipe_group:
-        pipe.update_image(pipe_img)
+    bg, ground_img, pipe_img, pipe_flipped_img = load_theme_images()
+    game.collider.set_pipe_image(pipe_img)
+
+def lerp(start, end, alpha):
+    """Interpolated pixel position between the last two simulation ticks"""
+    return int(round(start + (end - start) * alpha))
 
 def colorize_surface(surface, color):
     """Apply a color tint to a surface"""
@@ -247,29 +429,6 @@ def colorize_surface(surface, color):
     colored_surface.fill(color, special_flags=pygame.BLEND_RGBA_MULT)
     return colored_surface
 
-class Pipe(pygame.sprite.Sprite):
-    def __init__(self, x, y, position):
-        pygame.sprite.Sprite.__init__(self)
-        self.image = pipe_img.copy()
-        self.position = position
-        self.rect = self.image.get_rect()
-        if position == 1:
-            self.image = pygame.transform.flip(self.image, False, True)
-            self.rect.bottomleft = [x, y - int(pipe_gap / 2)]
-        elif position == -1:
-            self.rect.topleft = [x, y + int(pipe_gap / 2)]
-
-    def update_image(self, new_image):
-        """Update pipe image when theme changes"""
-        self.image = new_image.copy()
-        if self.position == 1:
-            self.image = pygame.transform.flip(self.image, False, True)
-
-    def update(self):
-        self.rect.x -= scroll_speed
-        if self.rect.right < 0:
-            self.kill()
-
 class Bird(pygame.sprite.Sprite):
     def __init__(self, x, y):
         pygame.sprite.Sprite.__init__(self)
@@ -279,17 +438,21 @@ class Bird(pygame.sprite.Sprite):
         self.image = self.images[self.index]
         self.rect = self.image.get_rect()
         self.rect.center = [x, y]
+        self.y = self.prev_y = self.rect.y
         self.vel = 0
-        self.clicked = False
     
     def load_images(self, bird_type):
+        # Skins are built once and shared between every Bird using them
+        if bird_type in bird_skin_frames:
+            self.images = bird_skin_frames[bird_type]
+            return
         self.images = []
         
         if bird_type == "bird":
             # Load the bird SVG images
             try:
                 for num in range(1, 4):
-                    img = pygame.image.load(f"img/bird{num}.svg").convert_alpha()
+                    img = get_sprite(f"img/bird{num}.svg")
                     self.images.append(img)
             except pygame.error:
                 bird_img = pygame.Surface((34, 24))
@@ -300,7 +463,7 @@ class Bird(pygame.sprite.Sprite):
             
         elif bird_type == "rocket":
             try:
-                rocket_img = pygame.image.load("img/rocket.svg").convert_alpha()
+                rocket_img = get_sprite("img/rocket.svg")
                 for i in range(3):
                     rotated = pygame.transform.rotate(rocket_img, i * 5 - 5)
                     self.images.append(rotated)
@@ -323,32 +486,53 @@ class Bird(pygame.sprite.Sprite):
                 fallback.fill((255, 0, 0))  # Red
                 pygame.draw.circle(fallback, (255, 255, 255), (20, 12), 10)
                 self.images.append(fallback)
+        bird_skin_frames[bird_type] = self.images
     
+    def snap(self):
+        """Jump straight to the engine position without interpolating"""
+        self.y = self.prev_y = game.bird_y
+        self.rect.topleft = (game.bird_x, game.bird_y)
+        self.vel = game.vel
+
+    def interpolate(self, alpha):
+        self.rect.y = lerp(self.prev_y, self.y, alpha)
+
     def update(self):
-        global flying, game_over
-        if flying:
-            self.vel += 0.5
-            if self.vel > 8:
-                self.vel = 8
-            if self.rect.bottom < 768:
-                self.rect.y += int(self.vel)
+        # Called once per simulation tick; position and velocity come from the engine
+        self.prev_y = self.y
+        self.y = game.bird_y
+        self.rect.x = game.bird_x
+        self.vel = game.vel
         
-        if not game_over:
-            if pygame.mouse.get_pressed()[0] == 1 and not self.clicked:
-                self.clicked = True
-                self.vel = -10
-            if pygame.mouse.get_pressed()[0] == 0:
-                self.clicked = False
-            
+        # Gameplay draws the unrotated bird_frame_images the collision masks are built
+        # from, so the tilt is never rendered and only the animation frame is kept
+        if not game.game_over:
             self.counter += 1
             if self.counter > 5:
                 self.counter = 0
                 self.index = (self.index + 1) % len(self.images)
                 self.image = self.images[self.index]
-            
-            self.image = pygame.transform.rotate(self.images[self.index], self.vel * -2)
-        else:
-            self.image = pygame.transform.rotate(self.images[self.index], -90)
+
+class DirtyImage(pygame.sprite.DirtySprite):
+    """A dirty sprite that is only redrawn when its image or position changes"""
+    def __init__(self, layer):
+        self._layer = layer
+        pygame.sprite.DirtySprite.__init__(self)
+        self.image = pygame.Surface((1, 1), pygame.SRCALPHA)
+        self.rect = self.image.get_rect()
+        self.visible = 0
+
+    def show(self, image, pos):
+        if image is not self.image or tuple(pos) != self.rect.topleft:
+            self.image = image
+            self.rect = image.get_rect(topleft=pos)
+            self.visible = 1
+            self.dirty = 1
+
+    def hide(self):
+        if self.visible:
+            self.visible = 0
+            self.dirty = 1
 
 class Button():
     def __init__(self, x, y, image):
@@ -372,19 +556,10 @@ def draw_welcome_screen():
     # Create a pulsating effect for the message
     pulse_value = abs(pygame.time.get_ticks() % 1000 - 500) / 500  # Value between 0 and 1
     pulse_size = 25 + int(pulse_value * 5)  # Font size between 25 and 30
-    pulse_font = pygame.font.Font("Jersey10-Regular.ttf", pulse_size)
-    
-    # Background with parallax effect
-    screen.blit(bg, (0, 0))
-    screen.blit(ground_img, (ground_scroll, 768))
-    
-    # Create a semi-transparent overlay for better text readability
-    overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 100))  # Semi-transparent black
-    screen.blit(overlay, (0, 0))
+    pulse_font = get_font(pulse_size)
     
-    # Draw the game title
-    draw_centered_text("SNAPPY BIRD", font, white, 200)
+    # Background, overlay, title and version info only change with the theme
+    draw_cached_layer("welcome", (current_theme, ground_scroll), draw_welcome_background)
     
     # Draw the bird animation
     bird_img = flappy.images[flappy.index]
@@ -400,24 +575,30 @@ def draw_welcome_screen():
     
     # Draw pulsating "Click to continue" message at the bottom
     draw_centered_text("Click to continue", pulse_font, white, 700)
+
+def draw_welcome_background():
+    # Background with parallax effect
+    screen.blit(bg, (0, 0))
+    screen.blit(ground_img, (ground_scroll, 768))
+    
+    # Create a semi-transparent overlay for better text readability
+    screen.blit(get_overlay(100), (0, 0))
+    
+    # Draw the game title
+    draw_centered_text("SNAPPY BIRD", font, white, 200)
     
     # Draw the version info
     version_text = "v1.0"
     draw_text(version_text, tiny_font, white, 10, screen_height - 40)
 
 
-# User Page Drawing Function
-def draw_user_page():
-    global showing_user_page, create_user_active, new_username, keyboard_active, selected_user_index
-    
+def draw_user_page_background(start_idx, visible_rows):
     # Background
     screen.blit(bg, (0, 0))
     screen.blit(ground_img, (ground_scroll, 768))
     
     # Dark overlay for better visibility
-    overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 150))  # Semi-transparent black
-    screen.blit(overlay, (0, 0))
+    screen.blit(get_overlay(150), (0, 0))
     
     # User selection frame
     frame_width = 500
@@ -438,28 +619,60 @@ def draw_user_page():
     # Header
     draw_text("Highest Score", small_font, white, table_rect.right - 200, table_rect.y - 40)
     
-    # List users and their high scores
-    user_list = list(users_data.items())
-    start_idx = max(0, min(selected_user_index, len(user_list) - 3))
-    
-    for i in range(start_idx, min(start_idx + 3, len(user_list))):
-        username, data = user_list[i]
+    for row, (rank, username, high_score_value) in enumerate(visible_rows):
+        i = start_idx + row
         row_color = light_gray if i == selected_user_index else white
-        row_rect = pygame.Rect(table_rect.x + 5, table_rect.y + 5 + ((i - start_idx) * 60), table_rect.width - 10, 50)
+        row_rect = pygame.Rect(table_rect.x + 5, table_rect.y + 5 + (row * 60), table_rect.width - 10, 50)
         pygame.draw.rect(screen, row_color, row_rect)
         
-        # Username
-        draw_text(username, smaller_font, black, row_rect.x + 10, row_rect.y + 10)
+        # Rank and username
+        draw_text(f"{rank + 1}. {username}", smaller_font, black, row_rect.x + 10, row_rect.y + 10)
         
         # Score
-        score_text = str(data["high_score"])
-        draw_text(score_text, smaller_font, black, row_rect.right - 50, row_rect.y + 10)
+        draw_text(str(high_score_value), smaller_font, black, row_rect.right - 50, row_rect.y + 10)
+    
+    # Search field
+    search_text = f"Search: {user_search}" if user_search else "Type a name to search"
+    draw_text(search_text, tiny_font, white, table_rect.x, table_rect.bottom + 8)
     
     # Create User Button
     create_button_rect = pygame.Rect(frame_x + frame_width - 180, frame_y + frame_height - 60, 160, 40)
     pygame.draw.rect(screen, orange, create_button_rect)
     pygame.draw.rect(screen, white, create_button_rect, 2)
     draw_text("CREATE A USER", tiny_font, white, create_button_rect.x + 10, create_button_rect.y + 10)
+
+def user_page_length():
+    """Number of rows in the user list: everyone, or the matches for the search"""
+    return leaderboard.count_prefix(user_search) if user_search else len(leaderboard)
+
+def user_page_rows(start, count):
+    """(rank, username, high score) for one page of the user list"""
+    if user_search:
+        return [(leaderboard.rank(name), name, leaderboard.score(name))
+                for name in leaderboard.search(user_search, start, count)]
+    return [(start + row, name, high_score_value)
+            for row, (name, high_score_value) in enumerate(leaderboard.page(start, count))]
+
+# User Page Drawing Function
+def draw_user_page():
+    global showing_user_page, create_user_active, new_username, keyboard_active, selected_user_index, user_search
+    
+    # User selection frame
+    frame_width = 500
+    frame_height = 400
+    frame_x = (screen_width - frame_width) // 2
+    frame_y = (screen_height - frame_height) // 2
+    table_rect = pygame.Rect(frame_x + 50, frame_y + 90, frame_width - 100, 200)
+    create_button_rect = pygame.Rect(frame_x + frame_width - 180, frame_y + frame_height - 60, 160, 40)
+    
+    # Only the visible page of the leaderboard is read
+    user_count = user_page_length()
+    start_idx = max(0, min(selected_user_index, user_count - user_page_size))
+    visible_rows = user_page_rows(start_idx, user_page_size)
+    
+    # The whole page is static until the theme, the visible rows, the search or the selection change
+    draw_cached_layer("user_page", (current_theme, ground_scroll, start_idx, selected_user_index, visible_rows, user_search),
+                      lambda: draw_user_page_background(start_idx, visible_rows))
     
     # Draw Create User Interface if active
     if create_user_active:
@@ -482,24 +695,38 @@ def draw_user_page():
                 return False
             
             # Check if a user was selected from the list
-            for i in range(start_idx, min(start_idx + 3, len(user_list))):
-                username, _ = user_list[i]
-                row_rect = pygame.Rect(table_rect.x + 5, table_rect.y + 5 + ((i - start_idx) * 60), table_rect.width - 10, 50)
+            for row, (_, username, _) in enumerate(visible_rows):
+                row_rect = pygame.Rect(table_rect.x + 5, table_rect.y + 5 + (row * 60), table_rect.width - 10, 50)
                 if row_rect.collidepoint(mouse_pos):
                     global current_user
                     current_user = username
-                    selected_user_index = i
+                    selected_user_index = start_idx + row
                     return True
         
-        # Keyboard navigation
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_UP and not create_user_active:
+        # Keyboard navigation and search
+        elif event.type == pygame.KEYDOWN and not create_user_active:
+            if event.key == pygame.K_UP:
                 selected_user_index = max(0, selected_user_index - 1)
-            elif event.key == pygame.K_DOWN and not create_user_active:
-                selected_user_index = min(len(user_list) - 1, selected_user_index + 1)
-            elif event.key == pygame.K_RETURN and not create_user_active and user_list:
-                current_user = user_list[selected_user_index][0]
-                return True
+            elif event.key == pygame.K_DOWN:
+                selected_user_index = max(0, min(user_count - 1, selected_user_index + 1))
+            elif event.key == pygame.K_PAGEUP:
+                selected_user_index = max(0, selected_user_index - user_page_size)
+            elif event.key == pygame.K_PAGEDOWN:
+                selected_user_index = max(0, min(user_count - 1, selected_user_index + user_page_size))
+            elif event.key == pygame.K_RETURN:
+                selected = user_page_rows(selected_user_index, 1)
+                if selected:
+                    current_user = selected[0][1]
+                    return True
+            elif event.key == pygame.K_BACKSPACE:
+                user_search = user_search[:-1]
+                selected_user_index = 0
+            elif event.key == pygame.K_ESCAPE:
+                user_search = ""
+                selected_user_index = 0
+            elif event.unicode.isprintable() and event.unicode and len(user_search) < 20:
+                user_search += event.unicode
+                selected_user_index = 0
     
     # User hasn't made a selection yet
     return False
@@ -514,9 +741,7 @@ def create_user_interface():
     modal_y = (screen_height - modal_height) // 2
     
     # Semi-transparent background
-    overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 180))  # Darker overlay for modal
-    screen.blit(overlay, (0, 0))
+    screen.blit(get_overlay(180), (0, 0))  # Darker overlay for modal
     
     # Modal window
     modal_rect = pygame.Rect(modal_x, modal_y, modal_width, modal_height)
@@ -536,7 +761,7 @@ def create_user_interface():
     if len(display_text) > 15:  # Limit display length
         display_text = display_text[:15]
     
-    text_surface = smaller_font.render(display_text, True, black)
+    text_surface = render_text(display_text, smaller_font, black)
     screen.blit(text_surface, (input_rect.x + 10, input_rect.y + 5))
     
     # Create button
@@ -563,8 +788,7 @@ def create_user_interface():
             elif event.key == pygame.K_RETURN:
                 if len(new_username) > 0:
                     # Create user and exit the modal
-                    users_data[new_username] = {"high_score": 0}
-                    save_users_data()
+                    add_user(new_username)
                     global current_user
                     current_user = new_username
                     create_user_active = False
@@ -577,8 +801,7 @@ def create_user_interface():
             
             # Create button clicked
             if create_btn_rect.collidepoint(mouse_pos) and len(new_username) > 0:
-                users_data[new_username] = {"high_score": 0}
-                save_users_data()
+                add_user(new_username)
                 current_user = new_username
                 create_user_active = False
                 keyboard_active = False
@@ -595,13 +818,13 @@ def create_user_interface():
 
 # Modify draw_game_over function to handle user high scores
 def draw_game_over():
-    global high_score, score, game_over, users_data, current_user
+    global high_score, score, game_over, current_user
     
     # Update the user's high score
     is_new_high_score = update_high_score(score)
     
     # Get the high score to display (user's high score or global high score)
-    display_high_score = users_data[current_user]["high_score"] if current_user in users_data else high_score
+    display_high_score = leaderboard.score(current_user) if current_user in leaderboard else high_score
     
     frame_color = orange if current_theme == 0 else (50, 50, 100)
     
@@ -634,9 +857,10 @@ def draw_game_over():
         go_to_main_menu()
 
 # Update the main game loop to include the user page
-users_data = load_users_data()
+leaderboard = Leaderboard((name, data["high_score"]) for name, data in score_store.users().items())
+score_store.close()
 
-def draw_main_menu():
+def draw_main_menu_background():
     screen.blit(bg, (0, 0))
     screen.blit(ground_img, (ground_scroll, 768))
     frame_color = orange if current_theme == 0 else (50, 50, 100)
@@ -650,9 +874,13 @@ def draw_main_menu():
     bird_box = pygame.Rect(500, 350, bird_img.get_width() + 10, bird_img.get_height() + 10)
     pygame.draw.rect(screen, white, bird_box)
     screen.blit(flappy.images[0], (500, 350))
-    smaller_start_img = pygame.transform.scale(start_img, 
-                                              (int(start_img.get_width() * 0.7), 
-                                               int(start_img.get_height() * 0.7)))
+
+def build_smaller_start_img():
+    return pygame.transform.scale(start_img, 
+                                  (int(start_img.get_width() * 0.7), 
+                                   int(start_img.get_height() * 0.7)))
+
+def build_bird_button_img():
     bird_button_img = pygame.Surface((140, 60))
     bird_button_img.fill((50, 150, 200))  # Blue color
     pygame.draw.rect(bird_button_img, white, (0, 0, 140, 60), 3)  # White border
@@ -660,6 +888,9 @@ def draw_main_menu():
     bird_text = bird_font.render(f'BIRD: {bird_types[current_bird_type].upper()}', True, white)
     bird_text_rect = bird_text.get_rect(center=(70, 30))
     bird_button_img.blit(bird_text, bird_text_rect)
+    return bird_button_img
+
+def build_theme_button_img():
     theme_button_img = pygame.Surface((140, 60))
     theme_button_img.fill((150, 100, 200))  # Purple color
     pygame.draw.rect(theme_button_img, white, (0, 0, 140, 60), 3)  # White border
@@ -667,6 +898,15 @@ def draw_main_menu():
     theme_text = theme_font.render(f'THEME: {themes[current_theme]["name"]}', True, white)
     theme_text_rect = theme_text.get_rect(center=(70, 30))
     theme_button_img.blit(theme_text, theme_text_rect)
+    return theme_button_img
+
+def draw_main_menu():
+    draw_cached_layer("main_menu", (current_theme, ground_scroll, high_score, current_bird_type),
+                      draw_main_menu_background)
+    frame_rect = pygame.Rect(232, 250, 400, 350)
+    smaller_start_img = get_widget("start_button", None, build_smaller_start_img)
+    bird_button_img = get_widget("bird_button", current_bird_type, build_bird_button_img)
+    theme_button_img = get_widget("theme_button", current_theme, build_theme_button_img)
     frame_center_x = frame_rect.x + frame_rect.width // 2
     start_button = Button(0, 0, smaller_start_img)
     start_button.set_center(frame_center_x, 550)
@@ -691,46 +931,77 @@ def draw_main_menu():
     
     return False
 
-def draw_bird_selection():
-    global showing_bird_selection
+def draw_selection_background(title):
     screen.blit(bg, (0, 0))
     screen.blit(ground_img, (ground_scroll, 768))
     frame_color = orange if current_theme == 0 else (50, 50, 100)
     frame_rect = pygame.Rect(132, 200, 600, 450)
     pygame.draw.rect(screen, frame_color, frame_rect)
     pygame.draw.rect(screen, white, frame_rect, 10)
-    draw_text("SELECT BIRD", font, white, 250, 220)
+    draw_text(title, font, white, 250, 220)
+
+def build_bird_option_img(i, bird_type):
+    button_width = 250
+    button_height = 150
+    button_img = pygame.Surface((button_width, button_height))
+    button_color = (50, 150, 200) if i == current_bird_type else (80, 80, 80)
+    button_img.fill(button_color)
+    pygame.draw.rect(button_img, white, (0, 0, button_width, button_height), 3)
+    btn_font = pygame.font.SysFont(None, 30)
+    btn_text = btn_font.render(bird_type.upper(), True, white)
+    text_rect = btn_text.get_rect(center=(button_width//2, 30))
+    button_img.blit(btn_text, text_rect)
+    # Bird preview in a white box below the label
+    preview_bird = Bird(0, 0)
+    preview_bird.load_images(bird_type)
+    bird_img = preview_bird.images[0]
+    img_x = button_width // 2 - bird_img.get_width() // 2
+    img_y = 60
+    bird_box = pygame.Rect(img_x - 5, img_y - 5, bird_img.get_width() + 10, bird_img.get_height() + 10)
+    pygame.draw.rect(button_img, white, bird_box)
+    button_img.blit(bird_img, (img_x, img_y))
+    return button_img
+
+def build_theme_option_img(i, theme):
+    button_width = 250
+    button_height = 150
+    button_img = pygame.Surface((button_width, button_height))
+    button_color = (150, 100, 200) if i == current_theme else (80, 80, 80)
+    button_img.fill(button_color)
+    pygame.draw.rect(button_img, white, (0, 0, button_width, button_height), 3)
+    btn_font = pygame.font.SysFont(None, 30)
+    btn_text = btn_font.render(theme["name"].upper(), True, white)
+    text_rect = btn_text.get_rect(center=(button_width//2, 30))
+    button_img.blit(btn_text, text_rect)
+    try:
+        preview_img = load_image(theme["bg"], theme_preview_size)
+    except (pygame.error, FileNotFoundError):
+        preview_img = pygame.Surface(theme_preview_size)
+        preview_img.fill(theme["sky"])
+    button_img.blit(preview_img, (10, 60))
+    return button_img
+
+def option_button(i, button_img, frame_rect):
+    button = Button(0, 0, button_img)
+    col = i % 2
+    row = i // 2
+    x_center = frame_rect.x + (frame_rect.width // 4) + (col * (frame_rect.width // 2))
+    y_center = frame_rect.y + 300 + (row * 160)
+    button.set_center(x_center, y_center)
+    return button
+
+def draw_bird_selection():
+    global showing_bird_selection
+    draw_cached_layer("bird_selection", (current_theme, ground_scroll),
+                      lambda: draw_selection_background("SELECT BIRD"))
+    frame_rect = pygame.Rect(132, 200, 600, 450)
     back_button = Button(20, 20, back_img)
     bird_buttons = []
-    bird_displays = []
     for i, bird_type in enumerate(bird_types):
-        temp_bird = Bird(0, 0)
-        temp_bird.load_images(bird_type)
-        button_width = 250
-        button_height = 150
-        button_img = pygame.Surface((button_width, button_height))
-        button_color = (50, 150, 200) if i == current_bird_type else (80, 80, 80)
-        button_img.fill(button_color)
-        pygame.draw.rect(button_img, white, (0, 0, button_width, button_height), 3)
-        btn_font = pygame.font.SysFont(None, 30)
-        btn_text = btn_font.render(bird_type.upper(), True, white)
-        text_rect = btn_text.get_rect(center=(button_width//2, 30))
-        button_img.blit(btn_text, text_rect)
-        button = Button(0, 0, button_img)
-        col = i % 2
-        row = i // 2
-        x_center = frame_rect.x + (frame_rect.width // 4) + (col * (frame_rect.width // 2))
-        y_center = frame_rect.y + 300 + (row * 160)
-        button.set_center(x_center, y_center)
-        bird_buttons.append(button)
-        bird_displays.append(temp_bird)
+        button_img = get_widget(f"bird_option_{i}", i == current_bird_type,
+                                lambda: build_bird_option_img(i, bird_type))
+        bird_buttons.append(option_button(i, button_img, frame_rect))
     for i, button in enumerate(bird_buttons):
-        bird_img = bird_displays[i].images[0]
-        img_x = button.rect.centerx - bird_img.get_width() // 2
-        img_y = button.rect.y + 60
-        bird_box = pygame.Rect(img_x - 5, img_y - 5, bird_img.get_width() + 10, bird_img.get_height() + 10)
-        pygame.draw.rect(screen, white, bird_box)
-        screen.blit(bird_img, (img_x, img_y))
         if button.draw():
             change_bird_type(i)
             showing_bird_selection = False
@@ -739,41 +1010,16 @@ def draw_bird_selection():
 
 def draw_theme_selection():
     global showing_theme_selection
-    screen.blit(bg, (0, 0))
-    screen.blit(ground_img, (ground_scroll, 768))
-    frame_color = orange if current_theme == 0 else (50, 50, 100)
+    draw_cached_layer("theme_selection", (current_theme, ground_scroll),
+                      lambda: draw_selection_background("SELECT THEME"))
     original_theme = current_theme
     frame_rect = pygame.Rect(132, 200, 600, 450)
-    pygame.draw.rect(screen, frame_color, frame_rect)
-    pygame.draw.rect(screen, white, frame_rect, 10)
-    draw_text("SELECT THEME", font, white, 250, 220)
     back_button = Button(20, 20, back_img)
     theme_buttons = []
     for i, theme in enumerate(themes):
-        button_width = 250
-        button_height = 150
-        button_img = pygame.Surface((button_width, button_height))
-        button_color = (150, 100, 200) if i == current_theme else (80, 80, 80)
-        button_img.fill(button_color)
-        pygame.draw.rect(button_img, white, (0, 0, button_width, button_height), 3)
-        btn_font = pygame.font.SysFont(None, 30)
-        btn_text = btn_font.render(theme["name"].upper(), True, white)
-        text_rect = btn_text.get_rect(center=(button_width//2, 30))
-        button_img.blit(btn_text, text_rect)
-        try:
-            preview_img = pygame.image.load(theme["bg"]).convert_alpha()
-            preview_img = pygame.transform.scale(preview_img, (button_width - 20, 80))
-        except (pygame.error, FileNotFoundError):
-            preview_img = pygame.Surface((button_width - 20, 80))
-            preview_img.fill(theme["sky"])
-        button_img.blit(preview_img, (10, 60))
-        button = Button(0, 0, button_img)
-        col = i % 2
-        row = i // 2
-        x_center = frame_rect.x + (frame_rect.width // 4) + (col * (frame_rect.width // 2))
-        y_center = frame_rect.y + 300 + (row * 160)
-        button.set_center(x_center, y_center)
-        theme_buttons.append(button)
+        button_img = get_widget(f"theme_option_{i}", i == current_theme,
+                                lambda: build_theme_option_img(i, theme))
+        theme_buttons.append(option_button(i, button_img, frame_rect))
     # --- FIX: Draw theme buttons and handle clicks ---
     for i, button in enumerate(theme_buttons):
         if button.draw():
@@ -787,15 +1033,108 @@ def draw_theme_selection():
 def draw_gameplay_ui():
     draw_text(str(score), font, white, int(screen_width / 2), 20)
 
-pipe_group = pygame.sprite.Group()
 bird_group = pygame.sprite.Group()
 flappy = Bird(100, int(screen_height / 2))
 bird_group.add(flappy)
+game = FlappyEngine(bird_size=flappy.rect.size, pipe_size=pipe_img.get_size())  # Collider is set once bird frames load
+current_replay = None
+
+# Dirty-rect renderer layers: pipes (0), bird (1), ground strip (2), score text (3)
+render_group = pygame.sprite.LayeredDirty()
+bird_view = DirtyImage(1)
+ground_view = DirtyImage(2)
+score_view = DirtyImage(3)
+render_group.add(bird_view, ground_view, score_view)
+# One pooled (top, bottom) sprite pair per engine pipe slot, reused as slots are
+pipe_views = [(DirtyImage(0), DirtyImage(0)) for _ in range(game.pipes.capacity)]
+for top_view, bottom_view in pipe_views:
+    render_group.add(top_view, bottom_view)
+render_alpha = 1.0  # Fraction of a tick between the engine's previous and current state
+shown_score = None
+
+def pipe_positions(slot):
+    """Interpolated screen positions of a pipe slot's top and bottom pipe"""
+    pipes = game.pipes
+    x = lerp(pipes.prev_x[slot], pipes.x[slot], render_alpha)
+    return (x, pipes.top_rect(slot)[1]), (x, pipes.bottom_rect(slot)[1])
+
+def read_flap():
+    """True on the frame the left mouse button goes down"""
+    global mouse_held
+    pressed = pygame.mouse.get_pressed()[0] == 1
+    flap = pressed and not mouse_held
+    mouse_held = pressed
+    return flap
+
+def step_simulation(frame_ms, flap):
+    """Run as many fixed engine ticks as the elapsed time calls for; returns the leftover fraction"""
+    global accumulator, pending_flap, prev_ground_scroll
+    accumulator += min(frame_ms, max_frame_ms)
+    pending_flap = pending_flap or flap
+    while accumulator >= tick_ms and not game.game_over:
+        prev_ground_scroll = game.ground_scroll
+        current_replay.record(pending_flap)
+        tick = game.tick
+        game.step(pending_flap)
+        pending_flap = False
+        bird_group.update()
+        animate_bird(tick)
+        accumulator -= tick_ms
+    if game.game_over:
+        return 1.0
+    return accumulator / tick_ms
+
+def interpolate_gameplay(alpha):
+    """Place sprites between the previous and current tick for smooth motion at any frame rate"""
+    global ground_scroll, render_alpha
+    render_alpha = alpha
+    flappy.interpolate(alpha)
+    if game.ground_scroll <= prev_ground_scroll:
+        ground_scroll = prev_ground_scroll + (game.ground_scroll - prev_ground_scroll) * alpha
+    else:
+        ground_scroll = game.ground_scroll  # The strip wrapped around this tick
+
+def draw_gameplay_dirty(bird_img):
+    global needs_full_repaint, shown_score
+    if needs_full_repaint:
+        # Something else drew over the screen, so start again from a clean background
+        render_group.clear(screen, bg)
+        render_group.repaint_rect(screen.get_rect())
+        needs_full_repaint = False
+    live_slots = set(game.pipes.slots())
+    for slot, (top_view, bottom_view) in enumerate(pipe_views):
+        if slot in live_slots:
+            top_pos, bottom_pos = pipe_positions(slot)
+            top_view.show(pipe_flipped_img, top_pos)
+            bottom_view.show(pipe_img, bottom_pos)
+        else:
+            top_view.hide()
+            bottom_view.hide()
+    bird_view.show(bird_img, (flappy.rect.x, flappy.rect.y))
+    ground_view.show(ground_img, (ground_scroll, ground_y))
+    if score != shown_score:
+        shown_score = score
+        score_view.show(render_text(str(score), font, white), (int(screen_width / 2), 20))
+    return render_group.draw(screen)
+
+def draw_gameplay(bird_img):
+    """Draw a gameplay frame. Returns the changed rectangles in dirty-rect mode, None otherwise"""
+    if dirty_rect_mode:
+        return draw_gameplay_dirty(bird_img)
+    screen.blit(bg, (0, 0))
+    for slot in game.pipes.slots():
+        top_pos, bottom_pos = pipe_positions(slot)
+        screen.blit(pipe_flipped_img, top_pos)
+        screen.blit(pipe_img, bottom_pos)
+    screen.blit(bird_img, (flappy.rect.x, flappy.rect.y))
+    screen.blit(ground_img, (ground_scroll, ground_y))
+    draw_gameplay_ui()
+    return None
 
 run = True
 
 def load_svg(filename):
-    return pygame.image.load(filename).convert_alpha()
+    return get_sprite(filename)
 
 # Load the SVG assets
 game_manual_img = load_svg("img/game.svg")
@@ -803,13 +1142,15 @@ game_over_img = load_svg("img/gameover.svg")
 bird_up_img = load_svg("img/bird_up.svg")
 bird_mid_img = load_svg("img/bird_mid.svg")
 bird_down_img = load_svg("img/bird_down.svg")
+bird_frame_images = [load_svg(frame) for frame in bird_frames]
+# Hit-test against the pixels actually drawn: one mask per bird frame and pipe orientation
+game.collider = MaskCollider(bird_frame_images, pipe_img)
 
-def animate_bird():
+def animate_bird(tick):
     global current_bird_frame
-    # Change bird frame every few frames for animation
-    if pygame.time.get_ticks() % 10 == 0:
-        current_bird_frame = (current_bird_frame + 1) % 3
-    return load_svg(bird_frames[current_bird_frame])
+    # The frame follows the engine tick, so drawing and mask collision always agree
+    current_bird_frame = anim_frame(tick, len(bird_frame_images))
+    return bird_frame_images[current_bird_frame]
 
 def change_bird():
     global selected_bird_index
@@ -818,8 +1159,9 @@ def change_bird():
 
 # Main game loop with fixes to prevent game freeze when losing
 while run:
-    clock.tick(fps)
+    frame_ms = clock.tick(fps)
     events = pygame.event.get()
+    dirty_rects = None
 
     # --- Show game manual at start ---
     if show_game_manual:
@@ -830,6 +1172,7 @@ while run:
                 run = False
             if event.type == pygame.KEYDOWN:
                 show_game_manual = False
+        needs_full_repaint = True
         pygame.display.update()
         continue
 
@@ -843,9 +1186,12 @@ while run:
             if event.type == pygame.KEYDOWN:
                 reset_game()
                 game_over_screen = False
+        needs_full_repaint = True
         pygame.display.update()
         continue
 
+    flap_pressed = read_flap()
+
     # Process ALL events at the beginning of each frame to prevent lag
     events = pygame.event.get()  # Store events to use throughout the frame
     for event in events:
@@ -855,8 +1201,6 @@ while run:
             if welcome_screen:
                 welcome_screen = False
                 showing_user_page = True
-            elif not flying and not game_over and game_started:
-                flying = True
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_c:  # 'C' key to change bird
                 change_bird()
@@ -878,58 +1222,38 @@ while run:
             high_score_updated = True
         draw_game_over()
     else:  # Normal game flow after welcome screen
-        screen.blit(bg, (0, 0))
         if showing_bird_selection:
             draw_bird_selection()
         elif showing_theme_selection:
             draw_theme_selection()
         elif game_started:
-            pipe_group.draw(screen)
-            current_bird_img = animate_bird()
-            screen.blit(current_bird_img, (flappy.rect.x, flappy.rect.y))
-            bird_group.update()
-            screen.blit(ground_img, (ground_scroll, 768))
-            if game_over:
-                draw_game_over()
-            else:
-                if pygame.sprite.groupcollide(bird_group, pipe_group, False, False) or flappy.rect.top < 0:
-                    game_over = True
-                    game_over_screen = True
-                if flappy.rect.bottom >= 768:
-                    game_over = True
-                    flying = False
-                    game_over_screen = True
-                
-                update_difficulty()
-                draw_gameplay_ui()
-                if len(pipe_group) > 0:
-                    if (bird_group.sprites()[0].rect.left > pipe_group.sprites()[0].rect.left and
-                        bird_group.sprites()[0].rect.right < pipe_group.sprites()[0].rect.right and
-                        not pass_pipe):
-                        pass_pipe = True
-                    
-                    if pass_pipe:
-                        if bird_group.sprites()[0].rect.left > pipe_group.sprites()[0].rect.right:
-                            score += 1
-                            pass_pipe = False
-                
-                time_now = pygame.time.get_ticks()
-                if time_now - last_pipe > pipe_frequency:
-                    pipe_height = random.randint(-100, 100)
-                    btm_pipe = Pipe(screen_width, int(screen_height / 2) + pipe_height, -1)
-                    top_pipe = Pipe(screen_width, int(screen_height / 2) + pipe_height, 1)
-                    pipe_group.add(btm_pipe)
-                    pipe_group.add(top_pipe)
-                    last_pipe = time_now
-                
-                ground_scroll -= scroll_speed
-                if abs(ground_scroll) > 35:
-                    ground_scroll = 0
+            # The engine owns the game state and runs at a fixed tick rate; frames only draw it
+            alpha = step_simulation(frame_ms, flap_pressed)
+            interpolate_gameplay(alpha)
+            current_bird_img = bird_frame_images[current_bird_frame]
+            flying = game.flying
+            score = game.score
+            if game.game_over:
+                game_over = True
+                game_over_screen = True
+                if not high_score_updated:
+                    if update_high_score(score):
+                        save_run_replay()
+                    high_score_updated = True
+            dirty_rects = draw_gameplay(current_bird_img)
         else:
             if draw_main_menu():
-                flying = True
-    pygame.display.update()
-    pygame.display.update()
+                reset_game()
+                game_started = True
+
+    # Exactly one display update per frame
+    if dirty_rects is not None:
+        pygame.display.update(dirty_rects)
+    else:
+        needs_full_repaint = True
+        pygame.display.update()
 
 
+score_writer.close()
+raster_writer.close()
 pygame.quit()
\ No newline at end of file
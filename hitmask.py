@@ -0,0 +1,35 @@
+"""Pixel-accurate bird/pipe collision for FlappyEngine using pygame masks."""
+import pygame
+
+from engine import anim_frame
+
+default_bird_frames = ["img/bird_up.svg", "img/bird_mid.svg", "img/bird_down.svg"]
+default_pipe = "img/pipe.svg"
+
+
+class MaskCollider():
+    """Masks built once per bird animation frame and per pipe orientation"""
+    def __init__(self, bird_frames, pipe_image):
+        self.bird_masks = [pygame.mask.from_surface(frame) for frame in bird_frames]
+        self.set_pipe_image(pipe_image)
+
+    def set_pipe_image(self, pipe_image):
+        self.pipe_masks = {
+            1: pygame.mask.from_surface(pygame.transform.flip(pipe_image, False, True)),
+            -1: pygame.mask.from_surface(pipe_image),
+        }
+
+    def __call__(self, engine, slot):
+        # The bird frame is drawn at the top left of the engine's bird rect
+        bird_mask = self.bird_masks[anim_frame(engine.tick, len(self.bird_masks))]
+        for position, rect in ((1, engine.pipes.top_rect(slot)), (-1, engine.pipes.bottom_rect(slot))):
+            offset = (rect[0] - engine.bird_x, rect[1] - engine.bird_y)
+            if bird_mask.overlap(self.pipe_masks[position], offset):
+                return True
+        return False
+
+
+def load_collider(bird_frame_paths=None, pipe_path=None):
+    """Build a MaskCollider straight from image files; no display is needed"""
+    frames = [pygame.image.load(path) for path in (bird_frame_paths or default_bird_frames)]
+    return MaskCollider(frames, pygame.image.load(pipe_path or default_pipe))
@@ -0,0 +1,78 @@
+"""In-memory leaderboard: users ranked by high score, with prefix search over names."""
+from bisect import bisect_left, insort
+
+# Sorts after any character a username can contain, to close a prefix range
+max_char = chr(0x10FFFF)
+
+
+def name_key(name):
+    return (name.casefold(), name)
+
+
+class Leaderboard():
+    """Two sorted lists over the same users.
+
+    ranking holds (-high_score, name) so the best player comes first and ties
+    are broken by name; names holds case-folded names for prefix search. Rank
+    lookups and searches are binary searches, pages are slices, and a score
+    change moves a single entry instead of re-sorting everyone.
+    """
+    def __init__(self, scores=()):
+        self.scores = dict(scores)
+        self.ranking = sorted((-high_score, name) for name, high_score in self.scores.items())
+        self.names = sorted(name_key(name) for name in self.scores)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __contains__(self, name):
+        return name in self.scores
+
+    def score(self, name):
+        return self.scores.get(name, 0)
+
+    def add(self, name, high_score=0):
+        """Add a user; returns False if the name is already taken"""
+        if name in self.scores:
+            return False
+        self.scores[name] = high_score
+        insort(self.ranking, (-high_score, name))
+        insort(self.names, name_key(name))
+        return True
+
+    def set_score(self, name, high_score):
+        entry = (-self.scores[name], name)
+        del self.ranking[bisect_left(self.ranking, entry)]
+        self.scores[name] = high_score
+        insort(self.ranking, (-high_score, name))
+
+    def rank(self, name):
+        """0-based position of a user in the ranking"""
+        return bisect_left(self.ranking, (-self.scores[name], name))
+
+    def top(self, count):
+        return self.page(0, count)
+
+    def page(self, start, count):
+        """(name, high_score) for ranks start to start + count - 1"""
+        if start < 0:
+            raise ValueError(f"start must not be negative, got {start}")
+        return [(name, -negative_score) for negative_score, name in self.ranking[start:start + count]]
+
+    def prefix_range(self, prefix):
+        """Slice of self.names whose names start with prefix, ignoring case"""
+        folded = prefix.casefold()
+        return (bisect_left(self.names, (folded,)),
+                bisect_left(self.names, (folded + max_char,)))
+
+    def count_prefix(self, prefix):
+        low, high = self.prefix_range(prefix)
+        return high - low
+
+    def search(self, prefix, start=0, count=None):
+        """Names starting with prefix in alphabetical order, optionally one page of them"""
+        if start < 0:
+            raise ValueError(f"start must not be negative, got {start}")
+        low, high = self.prefix_range(prefix)
+        end = high if count is None else min(high, low + start + count)
+        return [name for _, name in self.names[low + start:end]]
@@ -0,0 +1,312 @@
+"""Shared leaderboard over TCP: a batching asyncio client and a local SQLite-backed server.
+
+The protocol is one JSON object per line in each direction:
+    {"op": "submit", "scores": [[name, score], ...]}  ->  {"ok": true, "count": n, "rejected": m}
+    {"op": "top", "count": k}                          ->  {"ok": true, "top": [[name, score], ...]}
+Failures answer {"ok": false, "error": "..."}.
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+from scores import ScoreStore
+
+default_host = "127.0.0.1"
+default_port = 7788
+max_name_length = 20  # Same limit as the create-user dialog
+max_line = 1 << 20
+
+
+class ServerError(Exception):
+    """The server understood a request and refused it; sending it again will not help"""
+
+
+def encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+class ConnectionPool():
+    """Keep-alive connections to one server, opened on demand and reused between requests"""
+    def __init__(self, host, port, size=2, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.idle = []
+        self.slots = asyncio.Semaphore(size)
+
+    async def connect(self):
+        return await asyncio.wait_for(asyncio.open_connection(self.host, self.port, limit=max_line), self.timeout)
+
+    async def request(self, message):
+        async with self.slots:
+            # A reused connection may have been dropped by the server; give it one retry on a fresh one
+            attempts = 2 if self.idle else 1
+            for attempt in range(attempts):
+                reader, writer = self.idle.pop() if self.idle else await self.connect()
+                try:
+                    writer.write(encode(message))
+                    await writer.drain()
+                    line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if not line:
+                        raise ConnectionError("Server closed the connection")
+                except (OSError, asyncio.TimeoutError):
+                    writer.close()
+                    if attempt == attempts - 1:
+                        raise
+                    continue
+                self.idle.append((reader, writer))
+                reply = json.loads(line)
+                if not reply.get("ok"):
+                    raise ServerError(reply.get("error", "Request failed"))
+                return reply
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+class LeaderboardClient():
+    """Submits scores to a leaderboard server without ever blocking the caller.
+
+    submit() only hands the score to an event loop on a background thread.
+    There, scores are coalesced per user (best one wins) and sent in batches
+    of up to batch_size, at least every flush_interval seconds, over pooled
+    keep-alive connections. A batch that fails in transit is put back and
+    retried with exponential backoff; one the server refuses is dropped. If
+    more than max_pending users are waiting, the lowest scores are dropped.
+    """
+    def __init__(self, host=default_host, port=default_port, batch_size=100, flush_interval=1.0,
+                 pool_size=2, max_pending=10000, min_backoff=0.5, max_backoff=30.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.pending = {}  # name -> best unsent score; only touched on the loop thread
+        self.sent = 0
+        self.closing = False
+        self.loop = asyncio.new_event_loop()
+        self.wakeup = asyncio.Event()
+        self.pool = ConnectionPool(host, port, pool_size)
+        self.thread = threading.Thread(target=self.loop.run_forever, name="leaderboard-client", daemon=True)
+        self.thread.start()
+        self.sender = None
+        self.loop.call_soon_threadsafe(self.start_sender)
+
+    def start_sender(self):
+        self.sender = self.loop.create_task(self.send_loop())
+
+    def submit(self, name, score):
+        """Queue a score; safe to call from any thread"""
+        self.loop.call_soon_threadsafe(self.queue_scores, [(name, score)])
+
+    def top(self, count=10):
+        """concurrent.futures.Future resolving to [(name, score)] from the server"""
+        return asyncio.run_coroutine_threadsafe(self.fetch_top(count), self.loop)
+
+    async def fetch_top(self, count):
+        reply = await self.pool.request({"op": "top", "count": count})
+        return [tuple(row) for row in reply["top"]]
+
+    def queue_scores(self, scores):
+        for name, score in scores:
+            if score > self.pending.get(name, -1):
+                self.pending[name] = score
+        if len(self.pending) > self.max_pending:
+            keep = sorted(self.pending.items(), key=lambda item: item[1], reverse=True)[:self.max_pending]
+            self.pending = dict(keep)
+        if len(self.pending) >= self.batch_size:
+            self.wakeup.set()
+
+    def take_batch(self):
+        batch = []
+        for name in list(self.pending)[:self.batch_size]:
+            batch.append((name, self.pending.pop(name)))
+        return batch
+
+    async def send_loop(self):
+        backoff = self.min_backoff
+        while True:
+            if not self.pending:
+                if self.closing:
+                    return
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            # Let a batch fill up unless it already has, or we are shutting down
+            if len(self.pending) < self.batch_size and not self.closing:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            batch = self.take_batch()
+            try:
+                await self.pool.request({"op": "submit", "scores": batch})
+            except ServerError as e:
+                print(f"Leaderboard server refused {len(batch)} scores: {e}")
+                continue
+            except (OSError, asyncio.TimeoutError, ValueError):
+                self.queue_scores(batch)
+                # Jittered so a room full of cabinets does not retry in lockstep
+                await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            self.sent += len(batch)
+            backoff = self.min_backoff
+
+    async def shutdown(self, timeout):
+        self.closing = True
+        self.wakeup.set()
+        try:
+            # wait_for cancels the sender if it is still retrying when time runs out
+            await asyncio.wait_for(self.sender, timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.pool.close()
+
+    def close(self, timeout=2.0):
+        """Send what is still queued (waiting at most timeout seconds) and stop the loop"""
+        if not self.thread.is_alive():
+            return
+        asyncio.run_coroutine_threadsafe(self.shutdown(timeout), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+class LeaderboardServer():
+    """Accepts score batches from any number of clients and keeps them in a ScoreStore.
+
+    Submissions from every connection go through one queue and are committed
+    together (group commit), so a burst of clients costs one SQLite
+    transaction per round rather than one per request.
+    """
+    def __init__(self, store):
+        self.store = store
+        self.queue = asyncio.Queue()
+        self.commits = 0
+
+    async def commit_loop(self):
+        while True:
+            rounds = [await self.queue.get()]
+            while not self.queue.empty():
+                rounds.append(self.queue.get_nowait())
+            best = {}
+            for scores, _ in rounds:
+                for name, score in scores:
+                    best[name] = max(score, best.get(name, score))
+            try:
+                self.store.apply(list(best), best)
+                error = None
+            except Exception as e:
+                error = e
+            self.commits += 1
+            for _, done in rounds:
+                if not done.cancelled():
+                    if error is None:
+                        done.set_result(None)
+                    else:
+                        done.set_exception(error)
+
+    async def submit(self, scores):
+        if not isinstance(scores, list):
+            raise ValueError("scores must be a list")
+        # Malformed entries are skipped rather than failing the whole batch
+        checked = []
+        for entry in scores:
+            if not isinstance(entry, list) or len(entry) != 2:
+                continue
+            name, score = entry
+            if not isinstance(name, str) or not 0 < len(name) <= max_name_length:
+                continue
+            if not isinstance(score, int) or isinstance(score, bool) or score < 0:
+                continue
+            checked.append((name, score))
+        if checked:
+            done = asyncio.get_running_loop().create_future()
+            self.queue.put_nowait((checked, done))
+            await done
+        return {"ok": True, "count": len(checked), "rejected": len(scores) - len(checked)}
+
+    async def handle_request(self, message):
+        if message.get("op") == "submit":
+            return await self.submit(message.get("scores", []))
+        if message.get("op") == "top":
+            count = min(int(message.get("count", 10)), 1000)
+            return {"ok": True, "top": self.store.top(count)}
+        raise ValueError(f"Unknown op {message.get('op')!r}")
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = await self.handle_request(json.loads(line))
+                except (ValueError, TypeError, AttributeError) as e:
+                    reply = {"ok": False, "error": str(e)}
+                writer.write(encode(reply))
+                await writer.drain()
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=default_host, port=default_port):
+        committer = asyncio.create_task(self.commit_loop())
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=max_line)
+        print(f"Leaderboard server listening on {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            committer.cancel()
+
+
+def load_test(host, port, clients, scores_per_client, users):
+    """Push scores through several clients at once and report the throughput"""
+    started = time.perf_counter()
+    pool = [LeaderboardClient(host, port, flush_interval=0.05) for _ in range(clients)]
+    for client in pool:
+        for _ in range(scores_per_client):
+            client.submit(f"user{random.randrange(users)}", random.randint(0, 200))
+    for client in pool:
+        client.close(timeout=60)
+    elapsed = time.perf_counter() - started
+    sent = sum(client.sent for client in pool)
+    submitted = clients * scores_per_client
+    print(f"{submitted} scores from {clients} clients in {elapsed:.2f}s "
+          f"({submitted / elapsed:.0f}/s, {sent} sent after coalescing)")
+    checker = LeaderboardClient(host, port)
+    print("Top 5:", checker.top(5).result(10))
+    checker.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snappy Bird leaderboard service")
+    parser.add_argument("--host", default=default_host)
+    parser.add_argument("--port", type=int, default=default_port)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run the leaderboard server")
+    serve_parser.add_argument("--db", default="leaderboard.db", help="SQLite file the server keeps scores in")
+    load_parser = commands.add_parser("load", help="load-test a running server")
+    load_parser.add_argument("--clients", type=int, default=20)
+    load_parser.add_argument("--scores", type=int, default=5000, help="scores submitted per client")
+    load_parser.add_argument("--users", type=int, default=100000, help="distinct user names to draw from")
+    args = parser.parse_args()
+    if args.command == "serve":
+        store = ScoreStore(args.db)
+        try:
+            asyncio.run(LeaderboardServer(store).serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            store.close()
+    else:
+        load_test(args.host, args.port, args.clients, args.scores, args.users)
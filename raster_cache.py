@@ -0,0 +1,117 @@
+"""On-disk cache of rasterized images, so warm starts skip SVG parsing entirely."""
+import hashlib
+import os
+import struct
+import time
+import zlib
+
+import pygame
+
+from fileio import write_atomic
+
+loader_version = 1  # Bump when the way images are rasterized or scaled changes
+entry_header = "<4sII"  # magic, width, height; zlib-compressed RGBA pixels follow
+entry_magic = b"RGBA"
+max_entry_age = 30 * 24 * 60 * 60  # Seconds an entry may go unused before prune deletes it
+
+
+class RasterCache():
+    """Rasterized images keyed by (file content hash, target size, loader version).
+
+    A changed file hashes differently, so its stale entries are never looked
+    up again; prune deletes them once they have gone unused for a while.
+    write is called as write(path, data) to store new
+    entries; pass a background writer to keep disk writes off the caller's
+    thread.
+    """
+    def __init__(self, directory=".raster_cache", write=write_atomic):
+        self.directory = directory
+        self.write = write
+        self.content_hashes = {}  # path -> (mtime, size, hash) for this process
+        self.written = set()  # Entries handed to write but maybe not on disk yet
+        self.used = set()  # Entries looked up by this process
+        os.makedirs(directory, exist_ok=True)
+
+    def content_hash(self, path):
+        stat = os.stat(path)
+        known = self.content_hashes.get(path)
+        if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2]
+        with open(path, 'rb') as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+        self.content_hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def entry_path(self, path, size):
+        size_key = f"{size[0]}x{size[1]}" if size else "native"
+        key = f"{self.content_hash(path)}-{size_key}-{loader_version}-{pygame.version.ver}"
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".rgba")
+
+    def read_entry(self, entry, header_only=False):
+        try:
+            with open(entry, 'rb') as file:
+                data = file.read(struct.calcsize(entry_header)) if header_only else file.read()
+            magic, width, height = struct.unpack_from(entry_header, data)
+            if magic != entry_magic:
+                return None
+            if header_only:
+                return (width, height)
+            pixels = zlib.decompress(data[struct.calcsize(entry_header):])
+            return pygame.image.frombytes(pixels, (width, height), "RGBA")
+        except (OSError, struct.error, zlib.error, ValueError):
+            return None
+
+    def store(self, entry, surface):
+        if entry in self.written:
+            return
+        self.written.add(entry)
+        pixels = zlib.compress(pygame.image.tobytes(surface, "RGBA"), 1)
+        self.write(entry, struct.pack(entry_header, entry_magic, *surface.get_size()) + pixels)
+
+    def load(self, path, size=None):
+        """
+        Load an image file, scaled to size (w, h) if given.
+        Returns a Surface that still needs convert_alpha() for fast blitting.
+        """
+        entry = self.entry_path(path, size)
+        self.used.add(entry)
+        surface = self.read_entry(entry)
+        if surface is not None:
+            return surface
+        if size:
+            surface = pygame.transform.scale(self.load(path), size)
+        else:
+            surface = pygame.image.load(path)
+        self.store(entry, surface)
+        return surface
+
+    def image_size(self, path):
+        """Native size of an image, read from the cache entry's header when there is one"""
+        entry = self.entry_path(path, None)
+        self.used.add(entry)
+        size = self.read_entry(entry, header_only=True)
+        return size or self.load(path).get_size()
+
+    def prune(self, max_age=max_entry_age):
+        """
+        Delete entries no run has used for max_age seconds, and temp files left
+        behind by interrupted writes. Entries this process used are marked fresh
+        first by bumping their modification time. Returns the number deleted.
+        """
+        for entry in self.used:
+            try:
+                os.utime(entry)
+            except OSError:
+                pass  # Still queued in a background writer
+        cutoff = time.time() - max_age
+        removed = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith((".rgba", ".tmp")) or entry.path in self.used:
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
@@ -0,0 +1,116 @@
+"""Compact binary replays of FlappyEngine runs and a headless verifier for them."""
+import argparse
+import struct
+
+from engine import FlappyEngine
+
+replay_magic = b"FLPR"
+replay_version = 2  # Bump whenever engine rules change in a way that alters old replays
+# magic, version, seed, ticks, score, bird w/h, pipe w/h, hitbox
+header_formats = {1: "<4sHQIIHHHH", 2: "<4sHQIIHHHHB"}
+hitbox_rect = 0
+hitbox_mask = 1
+
+
+class Replay():
+    """The seed plus one flap bit per engine tick, enough to re-run a game exactly"""
+    def __init__(self, seed, bird_size=(51, 36), pipe_size=(78, 560), hitbox=hitbox_rect,
+                 version=replay_version):
+        self.seed = seed
+        self.bird_size = tuple(bird_size)
+        self.pipe_size = tuple(pipe_size)
+        self.hitbox = hitbox
+        self.version = version
+        self.ticks = 0
+        self.score = 0
+        self.bits = bytearray()
+
+    def record(self, flap):
+        """Append the input for the next tick"""
+        if self.ticks % 8 == 0:
+            self.bits.append(0)
+        if flap:
+            self.bits[-1] |= 1 << (self.ticks % 8)
+        self.ticks += 1
+
+    def flaps(self):
+        for tick in range(self.ticks):
+            yield bool(self.bits[tick >> 3] & (1 << (tick & 7)))
+
+    def to_bytes(self):
+        header = struct.pack(header_formats[replay_version], replay_magic, replay_version, self.seed,
+                             self.ticks, self.score, *self.bird_size, *self.pipe_size, self.hitbox)
+        return header + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < 6 or data[:4] != replay_magic:
+            raise ValueError("Not a replay file")
+        version = struct.unpack_from("<H", data, 4)[0]
+        if version not in header_formats:
+            raise ValueError(f"Unsupported replay version {version}")
+        header_format = header_formats[version]
+        if len(data) < struct.calcsize(header_format):
+            raise ValueError("Replay is truncated")
+        fields = struct.unpack_from(header_format, data)
+        seed, ticks, score, bird_w, bird_h, pipe_w, pipe_h = fields[2:9]
+        # Version 1 replays were always recorded with rectangle hitboxes
+        hitbox = fields[9] if version >= 2 else hitbox_rect
+        bits = data[struct.calcsize(header_format):]
+        if len(bits) != (ticks + 7) // 8:
+            raise ValueError("Replay input stream does not match its tick count")
+        replay = cls(seed, (bird_w, bird_h), (pipe_w, pipe_h), hitbox, version)
+        replay.ticks = ticks
+        replay.score = score
+        replay.bits = bytearray(bits)
+        return replay
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+
+def simulate(replay):
+    """Re-run a replay headlessly and return the engine at the end of it"""
+    if replay.version not in header_formats:
+        raise ValueError(f"Unsupported replay version {replay.version}")
+    collider = None
+    if replay.hitbox == hitbox_mask:
+        from hitmask import load_collider
+        collider = load_collider()
+    engine = FlappyEngine(bird_size=replay.bird_size, pipe_size=replay.pipe_size, collider=collider)
+    engine.reset(seed=replay.seed)
+    for flap in replay.flaps():
+        engine.step(flap)
+    return engine
+
+
+def verify_replay(replay, claimed_score=None):
+    """
+    Check that a replay really produces its score.
+    Returns (success, score the simulation reached).
+    """
+    if claimed_score is None:
+        claimed_score = replay.score
+    try:
+        engine = simulate(replay)
+    except ValueError:
+        return False, 0
+    # A genuine run ends exactly on the tick its game ended
+    ended_cleanly = engine.game_over and engine.tick + 1 == replay.ticks
+    return ended_cleanly and engine.score == claimed_score, engine.score
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify a Snappy Bird replay")
+    parser.add_argument("replay")
+    parser.add_argument("--score", type=int, help="score to check instead of the one stored in the replay")
+    args = parser.parse_args()
+    ok, score = verify_replay(Replay.load(args.replay), args.score)
+    print(f"{'Verified' if ok else 'REJECTED'}: simulated score {score}")
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,231 @@
+"""SQLite-backed store for user profiles and high scores."""
+import json
+import os
+import sqlite3
+import threading
+
+from fileio import write_atomic
+
+schema = """
+CREATE TABLE IF NOT EXISTS users (
+    name TEXT PRIMARY KEY,
+    high_score INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS users_by_score ON users (high_score DESC, name);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Files the game used to keep scores in, read once by migrate_legacy
+legacy_users_file = "users_data.json"
+legacy_players_file = "players.json"
+legacy_high_score_files = ("high_score.txt", "highscore.txt")
+
+
+class ScoreStore():
+    """Users and their best scores, plus the best score on this machine.
+
+    Every write is one transaction touching only the rows it changes, so a new
+    high score costs a single small write no matter how many profiles exist,
+    and a crash mid-write leaves the previous state intact.
+    """
+    def __init__(self, path="scores.db"):
+        self.path = path
+        # isolation_level=None: statements autocommit unless wrapped in an explicit transaction
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(schema)
+
+    def close(self):
+        self.db.close()
+
+    def users(self):
+        """{name: {"high_score": n}} in creation order, the shape users_data.json had"""
+        rows = self.db.execute("SELECT name, high_score FROM users ORDER BY rowid")
+        return {name: {"high_score": high_score} for name, high_score in rows}
+
+    def add_user(self, name):
+        """Create a profile; returns False if the name is taken"""
+        cursor = self.db.execute("INSERT OR IGNORE INTO users (name) VALUES (?)", (name,))
+        return cursor.rowcount == 1
+
+    def get_high_score(self, name=None):
+        """A user's best score, or the machine-wide best when name is None"""
+        if name is None:
+            row = self.db.execute("SELECT value FROM meta WHERE key = 'high_score'").fetchone()
+            return int(row[0]) if row else 0
+        row = self.db.execute("SELECT high_score FROM users WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def top(self, count):
+        """[(name, high_score)] for the count best users"""
+        return self.db.execute("SELECT name, high_score FROM users ORDER BY high_score DESC, name LIMIT ?",
+                               (count,)).fetchall()
+
+    def submit_score(self, name, score):
+        """Record a finished run; returns True if it beat the user's high score"""
+        with self.transaction():
+            cursor = self.db.execute("UPDATE users SET high_score = ? WHERE name = ? AND high_score < ?",
+                                     (score, name, score))
+            self.raise_high_score(score)
+        return cursor.rowcount == 1
+
+    def apply(self, new_users, scores):
+        """Create users and record their best scores ({name: score}) in one transaction"""
+        with self.transaction() as db:
+            db.executemany("INSERT OR IGNORE INTO users (name) VALUES (?)", [(name,) for name in new_users])
+            db.executemany("UPDATE users SET high_score = ? WHERE name = ? AND high_score < ?",
+                           [(score, name, score) for name, score in scores.items()])
+            if scores:
+                self.raise_high_score(max(scores.values()))
+
+    def raise_high_score(self, score):
+        self.db.execute("INSERT INTO meta (key, value) VALUES ('high_score', ?) "
+                        "ON CONFLICT(key) DO UPDATE SET value = excluded.value "
+                        "WHERE CAST(value AS INTEGER) < CAST(excluded.value AS INTEGER)", (str(score),))
+
+    def transaction(self):
+        return Transaction(self.db)
+
+
+class Transaction():
+    """Context manager running a block of statements as one atomic write"""
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+class ScoreWriter():
+    """Write-behind persistence: changes are queued by the game and applied on a background thread.
+
+    Queued changes are coalesced (a user's pending scores collapse to the best
+    one, a file keeps only its latest contents) and flushed in one transaction
+    at most every flush_interval seconds, so the render thread never touches
+    the disk. close() flushes whatever is still pending and stops the thread.
+    """
+    def __init__(self, path="scores.db", flush_interval=0.5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.pending = threading.Event()
+        self.closing = threading.Event()
+        self.new_users = {}  # Insertion-ordered set of names to create
+        self.scores = {}
+        self.files = {}
+        self.thread = threading.Thread(target=self.run, name="score-writer", daemon=True)
+        self.thread.start()
+
+    def add_user(self, name):
+        with self.lock:
+            self.new_users[name] = None
+        self.pending.set()
+
+    def submit_score(self, name, score):
+        with self.lock:
+            self.scores[name] = max(score, self.scores.get(name, score))
+        self.pending.set()
+
+    def write_file(self, path, data):
+        """Replace a file with data (bytes); the write is atomic on the writer thread"""
+        with self.lock:
+            self.files[path] = data
+        self.pending.set()
+
+    def run(self):
+        store = ScoreStore(self.path)
+        try:
+            while not self.closing.is_set():
+                self.pending.wait()
+                # Give a burst of changes time to pile up so they share one write
+                self.closing.wait(self.flush_interval)
+                self.flush(store)
+            self.flush(store)
+        finally:
+            store.close()
+
+    def flush(self, store):
+        with self.lock:
+            self.pending.clear()
+            new_users, self.new_users = list(self.new_users), {}
+            scores, self.scores = self.scores, {}
+            files, self.files = self.files, {}
+        if new_users or scores:
+            try:
+                store.apply(new_users, scores)
+            except sqlite3.Error as e:
+                print(f"Error saving scores: {e}")
+        for path, data in files.items():
+            try:
+                write_atomic(path, data)
+            except OSError as e:
+                print(f"Error writing {path}: {e}")
+
+    def close(self):
+        if self.thread.is_alive():
+            self.closing.set()
+            self.pending.set()
+            self.thread.join()
+
+
+def read_json(path):
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def read_int(path):
+    try:
+        with open(path, 'r') as file:
+            return int(file.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def migrate_legacy(store, directory="."):
+    """
+    Import users_data.json, players.json, high_score.txt and highscore.txt once.
+    Users found in several files keep their best score. Returns True if the
+    import ran, False if it had already been done.
+    """
+    with store.transaction() as db:
+        if db.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone():
+            return False
+        scores = {}
+        users_data = read_json(os.path.join(directory, legacy_users_file))
+        if isinstance(users_data, dict):
+            for name, data in users_data.items():
+                if isinstance(data, dict):
+                    scores[name] = max(scores.get(name, 0), int(data.get("high_score", 0)))
+        players = read_json(os.path.join(directory, legacy_players_file))
+        if isinstance(players, list):
+            for player in players:
+                if isinstance(player, dict) and "name" in player:
+                    scores[player["name"]] = max(scores.get(player["name"], 0), int(player.get("high_score", 0)))
+        for name, high_score in scores.items():
+            db.execute("INSERT INTO users (name, high_score) VALUES (?, ?) "
+                       "ON CONFLICT(name) DO UPDATE SET high_score = MAX(high_score, excluded.high_score)",
+                       (name, high_score))
+        best = [read_int(os.path.join(directory, path)) for path in legacy_high_score_files]
+        best = [value for value in best if value is not None] + list(scores.values())
+        if best:
+            store.raise_high_score(max(best))
+        db.execute("INSERT INTO meta (key, value) VALUES ('migrated', '1')")
+    return True
+
+
+def open_store(path="scores.db", legacy_directory="."):
+    """Open the score store, importing the legacy score files the first time"""
+    store = ScoreStore(path)
+    migrate_legacy(store, legacy_directory)
+    return store
@@ -0,0 +1,33 @@
+"""Sizes flappy.py draws its SVG images at, shared with the atlas builder in svgutility."""
+
+score_text_height = 43  # Height of the score text the trophy sits next to
+theme_preview_size = (230, 80)  # Background preview on a theme button
+
+
+def native_size(w, h):
+    return (w, h)
+
+
+def start_size(w, h):
+    """Size of the start button, from the native size of start.svg"""
+    return (int(w * 0.7), int(h * 0.5))
+
+
+def trophy_size(w, h):
+    """Size of the trophy, scaled to be as tall as the score text"""
+    return (int((w / h) * score_text_height), score_text_height)
+
+
+def theme_preview(w, h):
+    return theme_preview_size
+
+
+# Every size each image file is drawn at, computed from its native (w, h);
+# files that are not listed are only drawn at their native size
+drawn_sizes = {
+    "start.svg": [start_size],
+    "trophy.svg": [trophy_size],
+    "bg.svg": [native_size, theme_preview],
+    "nightmode.svg": [native_size, theme_preview],
+    "settings.svg": [],  # Not drawn by the game
+}
@@ -1,10 +1,223 @@
-import pygame
 import os
-import xml.etree.ElementTree as ET
-from svglib.svglib import svg2rlg
+# Keep stdout clean for JSON reports
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+from lxml import etree
+from svglib.svglib import SvgRenderer
 from reportlab.graphics import renderPM
-from PIL import Image
 import io
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import argparse
+import contextlib
+import copy
+import glob
+import hashlib
+import json
+import re
+import sys
+import time
+
+from fileio import write_atomic
+from sprite_sizes import drawn_sizes, native_size
+
+svg_ns = "{http://www.w3.org/2000/svg}"
+# Unlike svglib's own loader this keeps comments, so rewritten files lose nothing
+svg_parser = etree.XMLParser(remove_comments=False)
+
+class SvgDocument():
+    """
+    One SVG file, parsed at most once and rendered at most once.
+    The check, fix and verify stages all work on the same tree and drawing.
+    """
+    def __init__(self, path, data=None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.data = data  # File contents, if the caller already read them
+        self.tree = None
+        self.drawing = None
+        self.render_error = None
+        self.rendered = False
+
+    def parse(self):
+        if self.tree is None:
+            if self.data is not None:
+                self.tree = etree.ElementTree(etree.fromstring(self.data, svg_parser))
+            else:
+                self.tree = etree.parse(self.path, svg_parser)
+        return self.tree
+
+    def root(self):
+        return self.parse().getroot()
+
+    def render(self):
+        """
+        The svglib Drawing for the tree as it is now, or None if it cannot be rendered.
+        Rendering annotates the tree, so save any changes before calling this.
+        """
+        if not self.rendered:
+            self.rendered = True
+            try:
+                self.drawing = SvgRenderer(self.path).render(self.root())
+            except Exception as e:
+                self.render_error = e
+        if self.render_error is not None:
+            raise self.render_error
+        return self.drawing
+
+    def make_accessible(self):
+        add_accessibility_elements(self.root(), self.name.replace('.svg', ''))
+
+    def to_bytes(self):
+        return etree.tostring(self.parse(), xml_declaration=True, encoding="UTF-8")
+
+    def save(self, path=None):
+        data = self.to_bytes()
+        write_atomic(path or self.path, data)
+        return data
+
+def map_files(worker, paths, workers=None):
+    """
+    Run worker(path) for every path, across a process pool when there is more than one file.
+    Results come back in the order of paths no matter which worker finishes first.
+    workers=None uses one process per CPU; workers=1 runs everything in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2:
+        return [worker(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        return list(executor.map(worker, paths))
+
+manifest_name = ".svg_manifest.json"
+manifest_version = 2  # Bump when the entry format changes; older manifests are then ignored
+
+def fingerprint(path, data):
+    """Content hash of a file's bytes plus the stat fields used to skip rehashing it"""
+    stat = os.stat(path)
+    return {"sha256": hashlib.sha256(data).hexdigest(), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def load_manifest(directory):
+    """
+    {file name: {"sha256", "size", "mtime_ns", "issues", "verified", "verify_message"}}
+    from the last run. Audit and verify results are only valid for the exact bytes
+    they were computed on.
+    """
+    try:
+        with open(os.path.join(directory, manifest_name), 'r') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != manifest_version:
+        return {}
+    return manifest.get("files", {})
+
+def save_manifest(directory, manifest):
+    data = json.dumps({"version": manifest_version, "files": manifest}, indent=1, sort_keys=True).encode()
+    write_atomic(os.path.join(directory, manifest_name), data)
+
+def current_entry(manifest, directory, svg_file):
+    """
+    The manifest entry for a file if its bytes have not changed since it was recorded.
+    Unchanged size and mtime are trusted; otherwise the file is hashed again.
+    """
+    entry = manifest.get(svg_file)
+    if entry is None:
+        return None
+    file_path = os.path.join(directory, svg_file)
+    try:
+        stat = os.stat(file_path)
+        if (stat.st_size, stat.st_mtime_ns) == (entry["size"], entry["mtime_ns"]):
+            return entry
+        with open(file_path, 'rb') as file:
+            if hashlib.sha256(file.read()).hexdigest() != entry["sha256"]:
+                return None
+    except OSError:
+        return None
+    return dict(entry, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+class Manifests():
+    """
+    The manifests of every directory a run touches, keyed by file path.
+    Each is loaded on first use and written back by save() if it changed.
+    """
+    def __init__(self, incremental=True):
+        self.incremental = incremental
+        self.old = {}
+        self.new = {}
+
+    def manifest(self, directory):
+        if directory not in self.old:
+            old = load_manifest(directory) if self.incremental else {}
+            self.old[directory] = old
+            # Files that are gone are dropped; the rest carry over until they are checked
+            self.new[directory] = {name: entry for name, entry in old.items()
+                                   if os.path.exists(os.path.join(directory, name))}
+        return self.old[directory], self.new[directory]
+
+    def entry(self, path):
+        """The entry for path if the file is unchanged since it was recorded, else None"""
+        directory, name = os.path.split(path)
+        old, new = self.manifest(directory)
+        entry = current_entry(old, directory, name)
+        if entry is None:
+            new.pop(name, None)
+        else:
+            new[name] = entry
+        return entry
+
+    def record(self, path, result):
+        """Store a worker's result for the bytes it saw; failed files are left out so they are retried"""
+        directory, name = os.path.split(path)
+        new = self.manifest(directory)[1]
+        if "sha256" in result:
+            new[name] = {
+                "sha256": result["sha256"], "size": result["size"], "mtime_ns": result["mtime_ns"],
+                "issues": result["issues"], "verified": result.get("verified"),
+                "verify_message": result.get("verify_message", ""),
+            }
+        else:
+            new.pop(name, None)
+
+    def save(self):
+        if self.incremental:
+            for directory, new in self.new.items():
+                if new != self.old[directory]:
+                    save_manifest(directory, new)
+
+def list_svg_files(directory):
+    """SVG file names in a directory, sorted so reports come out in the same order every run"""
+    return sorted(f for f in os.listdir(directory) if f.endswith('.svg'))
+
+def find_svg_files(targets):
+    """
+    SVG paths named by targets: directories (every .svg in them), glob patterns or files.
+    Each path appears once, in the order the targets name them.
+    """
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            paths.extend(os.path.join(target, f) for f in list_svg_files(target))
+            continue
+        matches = [path for path in sorted(glob.glob(target)) if path.endswith('.svg')]
+        if not matches:
+            print(f"No SVG files match: {target}")
+        paths.extend(matches)
+    return list(dict.fromkeys(os.path.normpath(path) for path in paths))
+
+def find_backed_up_files(targets):
+    """SVG paths named by targets (as in find_svg_files) that have a backup to restore"""
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            paths.extend(os.path.join(target, f[:-len('.backup')])
+                         for f in sorted(os.listdir(target)) if f.endswith('.svg.backup'))
+            continue
+        for path in sorted(glob.glob(target)):
+            if path.endswith('.svg.backup'):
+                path = path[:-len('.backup')]
+            if os.path.exists(path + '.backup'):
+                paths.append(path)
+    return list(dict.fromkeys(os.path.normpath(path) for path in paths))
 
 def add_accessibility_to_svg(svg_path):
     """
@@ -12,111 +225,120 @@ def add_accessibility_to_svg(svg_path):
     Returns the path to the modified SVG or the original if modification fails.
     """
     try:
-        # Parse the SVG
-        tree = ET.parse(svg_path)
-        root = tree.getroot()
-        
-        # Extract filename without extension to use as title/description
-        filename = os.path.basename(svg_path).replace('.svg', '')
-        
-        # Add title if it doesn't exist
-        title_element = root.find('.//{http://www.w3.org/2000/svg}title')
-        if title_element is None:
-            title_element = ET.Element("{http://www.w3.org/2000/svg}title")
-            title_element.text = filename.capitalize()
-            root.insert(0, title_element)
-            
-        # Add description if it doesn't exist
-        desc_element = root.find('.//{http://www.w3.org/2000/svg}desc')
-        if desc_element is None:
-            desc_element = ET.Element("{http://www.w3.org/2000/svg}desc")
-            desc_element.text = f"Game element: {filename}"
-            if root.find('.//{http://www.w3.org/2000/svg}title') is not None:
-                root.insert(1, desc_element)
-            else:
-                root.insert(0, desc_element)
-                
-        # Add ARIA role if not present
-        if 'role' not in root.attrib:
-            root.set('role', 'img')
-        
-        # Add aria-labelledby if not present
-        if 'aria-labelledby' not in root.attrib and title_element is not None:
-            if 'id' not in title_element.attrib:
-                title_id = f"{filename}_title"
-                title_element.set('id', title_id)
-            else:
-                title_id = title_element.get('id')
-                
-            if desc_element is not None:
-                if 'id' not in desc_element.attrib:
-                    desc_id = f"{filename}_desc"
-                    desc_element.set('id', desc_id)
-                else:
-                    desc_id = desc_element.get('id')
-                root.set('aria-labelledby', f"{title_id} {desc_id}")
-            else:
-                root.set('aria-labelledby', title_id)
-        
-        # Create a temporary modified file
-        temp_path = f"{svg_path.replace('.svg', '')}_accessible.svg"
-        tree.write(temp_path)
-        return temp_path
+        return write_accessible_svg(svg_path)
     except Exception as e:
         print(f"Error adding accessibility to {svg_path}: {e}")
         return svg_path  # Return original file if modification fails
 
-def audit_svg_files(directory="img/"):
+def write_accessible_svg(svg_path):
     """
-    Check all SVG files in the directory for accessibility issues.
+    Write an accessible copy of an SVG next to it and return its path.
+    Raises on failure instead of printing, so it can run inside a worker process.
     """
-    if not os.path.exists(directory):
-        print(f"Directory not found: {directory}")
-        return []
-        
-    svg_files = [f for f in os.listdir(directory) if f.endswith('.svg')]
-    print(f"Found {len(svg_files)} SVG files to audit")
-    
-    issues = []
+    document = SvgDocument(svg_path)
+    document.make_accessible()
     
-    for svg_file in svg_files:
-        file_path = os.path.join(directory, svg_file)
-        try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            
-            file_issues = []
-            
-            # Check for title
-            if root.find('.//{http://www.w3.org/2000/svg}title') is None:
-                file_issues.append("Missing <title> element")
-                
-            # Check for description
-            if root.find('.//{http://www.w3.org/2000/svg}desc') is None:
-                file_issues.append("Missing <desc> element")
-                
-            # Check for role attribute
-            if 'role' not in root.attrib:
-                file_issues.append("Missing 'role' attribute")
-                
-            # Check for aria-labelledby
-            if 'aria-labelledby' not in root.attrib:
-                file_issues.append("Missing 'aria-labelledby' attribute")
+    # Create a temporary modified file
+    temp_path = f"{svg_path.replace('.svg', '')}_accessible.svg"
+    document.save(temp_path)
+    return temp_path
+
+def add_accessibility_elements(root, filename):
+    """
+    Give an SVG root element a title, description, role and aria-labelledby
+    wherever they are missing. filename (without extension) names the element.
+    """
+    # Add title if it doesn't exist
+    title_element = root.find(f'.//{svg_ns}title')
+    if title_element is None:
+        title_element = root.makeelement(f"{svg_ns}title", {})
+        title_element.text = filename.capitalize()
+        root.insert(0, title_element)
+        
+    # Add description if it doesn't exist
+    desc_element = root.find(f'.//{svg_ns}desc')
+    if desc_element is None:
+        desc_element = root.makeelement(f"{svg_ns}desc", {})
+        desc_element.text = f"Game element: {filename}"
+        if root.find(f'.//{svg_ns}title') is not None:
+            root.insert(1, desc_element)
+        else:
+            root.insert(0, desc_element)
             
-            # Check SVG validity
-            try:
-                drawing = svg2rlg(file_path)
-                if drawing is None:
-                    file_issues.append("SVG cannot be rendered")
-            except Exception as e:
-                file_issues.append(f"SVG rendering error: {str(e)}")
+    # Add ARIA role if not present
+    if 'role' not in root.attrib:
+        root.set('role', 'img')
+    
+    # Add aria-labelledby if not present
+    if 'aria-labelledby' not in root.attrib and title_element is not None:
+        if 'id' not in title_element.attrib:
+            title_id = f"{filename}_title"
+            title_element.set('id', title_id)
+        else:
+            title_id = title_element.get('id')
             
-            if file_issues:
-                issues.append((svg_file, file_issues))
-                
-        except Exception as e:
-            issues.append((svg_file, [f"Error parsing SVG: {e}"]))
+        if desc_element is not None:
+            if 'id' not in desc_element.attrib:
+                desc_id = f"{filename}_desc"
+                desc_element.set('id', desc_id)
+            else:
+                desc_id = desc_element.get('id')
+            root.set('aria-labelledby', f"{title_id} {desc_id}")
+        else:
+            root.set('aria-labelledby', title_id)
+
+def accessibility_issues(root):
+    """Accessibility features make_accessible would add to an SVG root, as a list of messages"""
+    file_issues = []
+    
+    # Check for title
+    if root.find(f'.//{svg_ns}title') is None:
+        file_issues.append("Missing <title> element")
+        
+    # Check for description
+    if root.find(f'.//{svg_ns}desc') is None:
+        file_issues.append("Missing <desc> element")
+        
+    # Check for role attribute
+    if 'role' not in root.attrib:
+        file_issues.append("Missing 'role' attribute")
+        
+    # Check for aria-labelledby
+    if 'aria-labelledby' not in root.attrib:
+        file_issues.append("Missing 'aria-labelledby' attribute")
+    
+    return file_issues
+
+def audit_document(document):
+    """Accessibility and rendering issues of a parsed SVG, as a list of messages"""
+    file_issues = accessibility_issues(document.root())
+    
+    # Check SVG validity
+    try:
+        if document.render() is None:
+            file_issues.append("SVG cannot be rendered")
+    except Exception as e:
+        file_issues.append(f"SVG rendering error: {str(e)}")
     
+    return file_issues
+
+def audit_svg_file(file_path):
+    """
+    Check one SVG for accessibility issues.
+    Returns {"file": path, "issues": [...], plus its fingerprint}; runs in a worker process.
+    """
+    result = {"file": file_path}
+    try:
+        with open(file_path, 'rb') as file:
+            data = file.read()
+        result.update(fingerprint(file_path, data))
+        result["issues"] = audit_document(SvgDocument(file_path, data))
+    except Exception as e:
+        result["issues"] = [f"Error parsing SVG: {e}"]
+    
+    return result
+
+def print_audit_report(issues):
     if issues:
         print("\nSVG Accessibility Issues:")
         for file_name, file_issues in issues:
@@ -125,148 +347,743 @@ def audit_svg_files(directory="img/"):
                 print(f"  - {issue}")
     else:
         print("\nNo SVG accessibility issues found!")
+
+def audit_svg_paths(paths, workers=None, incremental=True):
+    """
+    Check SVG files for accessibility issues and return [{"file", "issues"}] in path order.
+    Files are audited in parallel (workers processes, default one per CPU).
+    With incremental=True only files whose bytes changed since the last run are
+    audited again; the others reuse the results kept in their directory's manifest.
+    """
+    manifests = Manifests(incremental)
+    results = {}
+    for path in paths:
+        entry = manifests.entry(path)
+        if entry is not None:
+            results[path] = {"file": path, "issues": entry["issues"]}
+    changed = [path for path in paths if path not in results]
+    print(f"Found {len(paths)} SVG files to audit ({len(paths) - len(changed)} unchanged since the last run)")
+    
+    for path, result in zip(changed, map_files(audit_svg_file, changed, workers)):
+        results[path] = result
+        manifests.record(path, result)
+    manifests.save()
     
-    return issues
+    results = [results[path] for path in paths]
+    print_audit_report([(result["file"], result["issues"]) for result in results if result["issues"]])
+    return results
 
-def batch_process_svgs(directory="img/"):
+def audit_svg_files(directory="img/", workers=None, incremental=True):
     """
-    Process all SVG files in the directory to add accessibility features.
-    Creates backup files before modifying.
+    Check all SVG files in the directory for accessibility issues.
+    Returns [(path, issues)] for the files that have any.
     """
     if not os.path.exists(directory):
         print(f"Directory not found: {directory}")
-        return 0, 0
+        return []
+    
+    results = audit_svg_paths(find_svg_files([directory]), workers, incremental)
+    return [(result["file"], result["issues"]) for result in results if result["issues"]]
+
+def make_backup(file_path, data):
+    """
+    Keep the original bytes of a file at file_path + ".backup".
+    A hard link costs no copy: the file itself is only ever replaced, never written in place.
+    """
+    backup_path = file_path + ".backup"
+    try:
+        os.link(file_path, backup_path)
+    except OSError:
+        write_atomic(backup_path, data)
+
+def process_svg_file(file_path, verify=False):
+    """
+    Back up one SVG, add accessibility features to it, then audit (and optionally
+    verify) the result from the same parsed tree. Files that already have every
+    feature are skipped. A backup is only made if there is none yet, so it keeps
+    the oldest version, whichever stage (process or optimize) first changed the
+    file. The new contents replace the file in a single atomic write. Runs in a
+    worker process and returns
+    {"file", "status": "processed" | "skipped" | "error", "message", "issues",
+    "verified": True | False | None (not verified), "verify_message"}
+    plus the fingerprint of the file as it was left.
+    """
+    backup_path = file_path + ".backup"
+    result = {"file": file_path, "status": "processed", "message": "", "issues": [],
+              "verified": None, "verify_message": ""}
+    
+    try:
+        with open(file_path, 'rb') as src_file:
+            data = src_file.read()
+        document = SvgDocument(file_path, data)
+        document.parse()
         
-    svg_files = [f for f in os.listdir(directory) if f.endswith('.svg')]
-    print(f"Found {len(svg_files)} SVG files to process")
+        # What is already there is left alone, so processing a file twice changes nothing
+        if not accessibility_issues(document.root()):
+            result["status"] = "skipped"
+            result["message"] = "already accessible"
+        else:
+            if not os.path.exists(backup_path):
+                make_backup(file_path, data)
+            document.make_accessible()
+            data = document.save()
+        result.update(fingerprint(file_path, data))
+    except Exception as e:
+        result["status"] = "error"
+        result["message"] = str(e)
+        return result
+    
+    # Post-processing audit and verification reuse the tree and its one rendering
+    result["issues"] = audit_document(document)
+    if verify:
+        result["verified"], result["verify_message"] = verify_document(document)
+    return result
+
+def process_svg_paths(paths, workers=None, verify=False, incremental=True):
+    """
+    Add accessibility features to SVG files and return process_svg_file's results in path order.
+    Creates backup files before modifying. Files are processed in parallel
+    (workers processes, default one per CPU), and each is parsed and rendered
+    only once for processing, the post-processing audit and verification.
+    With incremental=True, files the manifest shows unchanged and already
+    accessible (and verified, if verify is set) are not touched at all.
+    """
+    manifests = Manifests(incremental)
+    results = {}
+    for path in paths:
+        entry = manifests.entry(path)
+        if entry is not None and not entry["issues"] and (not verify or entry["verified"] is not None):
+            results[path] = {"file": path, "status": "unchanged", "message": "",
+                             "issues": [], "verified": entry["verified"],
+                             "verify_message": entry["verify_message"]}
+    changed = [path for path in paths if path not in results]
+    print(f"Found {len(paths)} SVG files to process ({len(paths) - len(changed)} unchanged since the last run)")
+    
+    worker = partial(process_svg_file, verify=verify)
+    for path, result in zip(changed, map_files(worker, changed, workers)):
+        results[path] = result
+        manifests.record(path, result)
+    manifests.save()
+    results = [results[path] for path in paths]
     
     processed_files = 0
     skipped_files = 0
-    
-    for svg_file in svg_files:
-        file_path = os.path.join(directory, svg_file)
-        backup_path = file_path + ".backup"
-        
-        # Only create a backup if it doesn't exist
-        if not os.path.exists(backup_path):
-            try:
-                # Create backup
-                with open(file_path, 'rb') as src_file:
-                    with open(backup_path, 'wb') as backup_file:
-                        backup_file.write(src_file.read())
-                
-                # Get accessible version
-                accessible_path = add_accessibility_to_svg(file_path)
-                
-                # If a new file was created, replace the original
-                if accessible_path != file_path:
-                    with open(accessible_path, 'rb') as acc_file:
-                        with open(file_path, 'wb') as orig_file:
-                            orig_file.write(acc_file.read())
-                    
-                    # Remove temporary file
-                    try:
-                        os.remove(accessible_path)
-                    except:
-                        pass
-                    
-                    processed_files += 1
-                    print(f"Processed: {svg_file}")
-                else:
-                    skipped_files += 1
-                    print(f"Skipped (no changes needed): {svg_file}")
-                    
-            except Exception as e:
-                print(f"Error processing {svg_file}: {e}")
-                skipped_files += 1
+    for result in results:
+        if result["status"] == "processed":
+            processed_files += 1
+            print(f"Processed: {result['file']}")
+        elif result["status"] == "skipped":
+            skipped_files += 1
+            print(f"Skipped ({result['message']}): {result['file']}")
+        elif result["status"] == "unchanged":
+            skipped_files += 1
         else:
-            print(f"Skipped (backup exists): {svg_file}")
             skipped_files += 1
+            print(f"Error processing {result['file']}: {result['message']}")
     
     print(f"\nProcessing complete! Processed: {processed_files}, Skipped: {skipped_files}")
     
-    # Run an audit to verify the results
-    print("\nRunning post-processing audit...")
-    audit_svg_files(directory)
+    # Report the audit each worker already ran on its file
+    print("\nPost-processing audit:")
+    issues = [(result["file"], result["issues"] or [f"Error parsing SVG: {result['message']}"])
+              for result in results if result["issues"] or result["status"] == "error"]
+    print_audit_report(issues)
+    
+    if verify:
+        checked = [result for result in results if result["verified"] is not None]
+        failed = [result for result in checked if not result["verified"]]
+        for result in failed:
+            print(f"Verification failed: {result['file']}: {result['verify_message']}")
+        print(f"Verified: {len(checked) - len(failed)}, Failed: {len(failed)}")
     
-    return processed_files, skipped_files
+    return results
 
-def restore_backups(directory="img/"):
+def batch_process_svgs(directory="img/", workers=None, verify=False, incremental=True):
     """
-    Restore all SVG files from their backups.
+    Process all SVG files in the directory to add accessibility features.
+    Returns (processed, skipped) file counts.
     """
     if not os.path.exists(directory):
         print(f"Directory not found: {directory}")
-        return 0
-        
-    backup_files = [f for f in os.listdir(directory) if f.endswith('.svg.backup')]
-    print(f"Found {len(backup_files)} backup files to restore")
+        return 0, 0
     
-    restored_files = 0
+    results = process_svg_paths(find_svg_files([directory]), workers, verify, incremental)
+    processed_files = sum(1 for result in results if result["status"] == "processed")
+    return processed_files, len(results) - processed_files
+
+# Namespaces of editor bookkeeping that renderers ignore
+editor_namespaces = {
+    "http://www.inkscape.org/namespaces/inkscape",
+    "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd",
+    "http://www.bohemiancoding.com/sketch/ns",
+    "http://ns.adobe.com/AdobeIllustrator/10.0/",
+    "http://ns.adobe.com/AdobeSVGViewerExtensions/3.0/",
+    "http://ns.adobe.com/Extensibility/1.0/",
+    "http://ns.adobe.com/Graphs/1.0/",
+    "http://ns.adobe.com/SaveForWeb/1.0/",
+    "http://ns.adobe.com/Variables/1.0/",
+    "http://purl.org/dc/elements/1.1/",
+    "http://creativecommons.org/ns#",
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+}
+# Elements whose text is content, so whitespace in them matters
+text_elements = {f"{svg_ns}{tag}" for tag in ("text", "tspan", "textPath", "title", "desc", "style", "script")}
+# Attributes a child inherits from its group, so a one-child group can hand them down
+inherited_attributes = {
+    "fill", "fill-opacity", "fill-rule", "stroke", "stroke-width", "stroke-opacity", "stroke-linecap",
+    "stroke-linejoin", "stroke-miterlimit", "stroke-dasharray", "stroke-dashoffset", "color", "visibility",
+}
+path_token = re.compile(r"[A-Za-z]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+translate_pattern = re.compile(r"\s*translate\(\s*([-+\d.eE]+)(?:[\s,]+([-+\d.eE]+))?\s*\)\s*$")
+
+def namespace(name):
+    return name[1:].split("}")[0] if name.startswith("{") else ""
+
+def remove_element(element):
+    """Remove an element but keep the text that follows it"""
+    parent = element.getparent()
+    if element.tail and element.tail.strip():
+        previous = element.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or "") + element.tail
+        else:
+            parent.text = (parent.text or "") + element.tail
+    parent.remove(element)
+
+def strip_metadata(root):
+    """Drop comments, processing instructions, <metadata>, editor elements and attributes, and layout whitespace"""
+    for node in list(root.iter(etree.Comment, etree.ProcessingInstruction)):
+        remove_element(node)
+    for element in list(root.iter(f"{svg_ns}metadata")):
+        remove_element(element)
+    for element in list(root.iter()):
+        if namespace(element.tag) in editor_namespaces:
+            remove_element(element)
+            continue
+        for name in list(element.attrib):
+            if namespace(name) in editor_namespaces:
+                del element.attrib[name]
+    for element in root.iter():
+        if element.tag not in text_elements and element.text and not element.text.strip():
+            element.text = None
+        parent = element.getparent()
+        if parent is not None and parent.tag not in text_elements and element.tail and not element.tail.strip():
+            element.tail = None
+    etree.cleanup_namespaces(root)
+
+def collapse_groups(root):
+    """
+    Unwrap groups that do nothing: ones without attributes, and ones with a
+    single child that can take over their inherited attributes and transform.
+    """
+    for group in reversed(list(root.iter(f"{svg_ns}g"))):
+        children = list(group)
+        if group.attrib:
+            if len(children) != 1 or not isinstance(children[0].tag, str):
+                continue
+            child = children[0]
+            movable = all((name in inherited_attributes and name not in child.attrib) or name == "transform"
+                          for name in group.attrib)
+            if not movable:
+                continue
+            for name, value in group.attrib.items():
+                if name == "transform":
+                    value = f"{value} {child.get('transform')}" if "transform" in child.attrib else value
+                child.set(name, value)
+        parent = group.getparent()
+        if parent is None or (group.text and group.text.strip()):
+            continue
+        index = parent.index(group)
+        for offset, child in enumerate(children):
+            parent.insert(index + offset, child)
+        remove_element(group)
+
+def dedupe_defs(root):
+    """
+    Merge every <defs> into the first one and drop definitions identical to an earlier one,
+    pointing their references (attributes and <style> sheets alike) at the one that is kept.
+    """
+    all_defs = list(root.iter(f"{svg_ns}defs"))
+    if not all_defs:
+        return
+    defs = all_defs[0]
+    for other in all_defs[1:]:
+        for child in list(other):
+            defs.append(child)
+        remove_element(other)
+    seen = {}
+    replaced = {}
+    for child in list(defs):
+        if not isinstance(child.tag, str) or child.get("id") is None:
+            continue
+        attributes = sorted((name, value) for name, value in child.attrib.items() if name != "id")
+        signature = (child.tag, tuple(attributes), b"".join(etree.tostring(c) for c in child))
+        if signature in seen:
+            replaced[child.get("id")] = seen[signature]
+            defs.remove(child)
+        else:
+            seen[signature] = child.get("id")
+    if len(defs) == 0:
+        remove_element(defs)
+    if not replaced:
+        return
+    reference = re.compile(r"url\(\s*#(" + "|".join(re.escape(old) for old in replaced) + r")\s*\)")
+    for element in root.iter():
+        if not isinstance(element.tag, str):
+            continue
+        if element.tag == f"{svg_ns}style" and element.text and "url(" in element.text:
+            element.text = reference.sub(lambda match: f"url(#{replaced[match.group(1)]})", element.text)
+        for name, value in element.attrib.items():
+            if name.endswith("href") and value[1:] in replaced and value.startswith("#"):
+                element.set(name, "#" + replaced[value[1:]])
+            elif "url(" in value:
+                element.set(name, reference.sub(lambda match: f"url(#{replaced[match.group(1)]})", value))
+
+def format_number(value, precision):
+    text = f"{round(value, precision):.{precision}f}".rstrip("0").rstrip(".") if precision > 0 else str(round(value))
+    return "0" if text in ("-0", "") else text
+
+def is_straight(start, control1, control2, end, tolerance):
+    """True if a cubic Bézier's control points lie on the segment between its ends, making it a line"""
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    length_squared = dx * dx + dy * dy
+    for x, y in (control1, control2):
+        px, py = x - start[0], y - start[1]
+        if length_squared == 0:
+            if px * px + py * py > tolerance * tolerance:
+                return False
+            continue
+        t = (px * dx + py * dy) / length_squared
+        if t < 0 or t > 1 or abs(px * dy - py * dx) ** 2 > tolerance * tolerance * length_squared:
+            return False
+    return True
+
+def optimize_path_data(d, precision=3, offset=None):
+    """
+    Rewrite path data compactly: absolute coordinates rounded to precision decimals,
+    cubic curves that are really straight lines turned into L segments, and
+    offset (dx, dy) added to every point. Returns None if offset was given but
+    the path uses commands it cannot be applied to (anything beyond absolute M, L, C, Z).
+    """
+    commands = []
+    for token in path_token.findall(d):
+        if token.isalpha():
+            commands.append((token, []))
+        elif commands:
+            commands[-1][1].append(float(token))
+    if offset is not None:
+        if any(command not in "MLCZ" for command, _ in commands):
+            return None
+        dx, dy = offset
+        commands = [(command, [value + (dy if i % 2 else dx) for i, value in enumerate(values)])
+                    for command, values in commands]
     
-    for backup_file in backup_files:
-        backup_path = os.path.join(directory, backup_file)
-        original_path = backup_path.replace('.backup', '')
-        
+    tolerance = 0.5 * 10 ** -precision
+    segments = []
+    current = start = None
+    for command, values in commands:
+        if command in "MLC":
+            size = 6 if command == "C" else 2
+            for i in range(0, len(values) - size + 1, size):
+                points = values[i:i + size]
+                if command == "C" and current is not None and is_straight(
+                        current, points[0:2], points[2:4], points[4:6], tolerance):
+                    segments.append(("L", points[4:6]))
+                else:
+                    segments.append((command if command != "M" or i == 0 else "L", points))
+                current = (points[-2], points[-1])
+                if command == "M" and i == 0:
+                    start = current
+        elif command in "Zz":
+            segments.append((command, []))
+            current = start
+        else:
+            # Relative and other commands move the pen in ways not tracked here
+            segments.append((command, values))
+            current = None
+            if command == "m":
+                start = None
+    
+    output = []
+    previous = None
+    for command, values in segments:
+        # Rounding relative offsets would let errors add up along the path
+        numbers = [format_number(value, precision if command.isupper() else precision + 2) for value in values]
+        text = ""
+        for number in numbers:
+            text += number if not text or number.startswith("-") else " " + number
+        if command == previous and command not in "MmZz":
+            output.append(" " + text if not text.startswith("-") else text)
+        else:
+            output.append(command + text)
+        previous = command
+    return "".join(output)
+
+def references_url(element, names=None):
+    """True if any of the element's attributes (or just those named) point at a url(#...)"""
+    return any("url(" in value for name, value in element.attrib.items() if names is None or name in names)
+
+def fold_translate(path, precision):
+    """
+    Apply a path's translate() transform to its coordinates, if that can be done exactly.
+    Clips, masks, filters, markers and paint servers are resolved in the path's own
+    coordinates, so a path using any of them, or inheriting a paint server, keeps its transform.
+    """
+    match = translate_pattern.match(path.get("transform", ""))
+    if match is None or references_url(path):
+        return False
+    if any(references_url(ancestor, ("fill", "stroke", "style")) for ancestor in path.iterancestors()):
+        return False
+    offset = (float(match.group(1)), float(match.group(2) or 0))
+    d = optimize_path_data(path.get("d", ""), precision, offset)
+    if d is None:
+        return False
+    path.set("d", d)
+    del path.attrib["transform"]
+    return True
+
+def optimize_document(document, precision=3):
+    """
+    Shrink an SVG tree without changing what it draws: strip comments and editor
+    metadata, unwrap redundant groups, dedupe <defs>, and quantize path data.
+    The accessibility elements and attributes are left alone.
+    """
+    # A copy of the root leaves behind the comments and instructions around it
+    document.tree = etree.ElementTree(copy.deepcopy(document.root()))
+    root = document.root()
+    strip_metadata(root)
+    collapse_groups(root)
+    dedupe_defs(root)
+    # Style sheets can hand a path a paint server no attribute shows, so then nothing is folded
+    foldable = not any("url(" in (style.text or "") for style in root.iter(f"{svg_ns}style"))
+    for path in root.iter(f"{svg_ns}path"):
+        if "d" in path.attrib and not (foldable and fold_translate(path, precision)):
+            path.set("d", optimize_path_data(path.get("d"), precision))
+
+def best_time(function, repeat):
+    """Shortest of repeat timed calls of function(), in seconds"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def parse_times(file_path, data, repeat=3):
+    """Seconds svglib and pygame each take to turn the bytes of an SVG into a drawing or Surface"""
+    svglib_time = best_time(lambda: SvgRenderer(file_path).render(etree.fromstring(data, svg_parser)), repeat)
+    pygame_time = best_time(lambda: pygame.image.load(io.BytesIO(data), os.path.basename(file_path)), repeat)
+    return svglib_time, pygame_time
+
+def optimize_svg_file(file_path, precision=3):
+    """
+    Optimize one SVG in place (backing it up first if it has no backup yet) and measure
+    what it saved. Runs in a worker process and returns {"file", "status": "optimized" |
+    "unchanged" | "error", "message", "bytes_before", "bytes_after", "svglib_ms_before",
+    "svglib_ms_after", "pygame_ms_before", "pygame_ms_after", "issues"} plus the fingerprint.
+    """
+    result = {"file": file_path, "status": "optimized", "message": "", "issues": []}
+    try:
+        with open(file_path, 'rb') as src_file:
+            data = src_file.read()
+        document = SvgDocument(file_path, data)
+        optimize_document(document, precision)
+        optimized = document.to_bytes()
+        result["bytes_before"], result["bytes_after"] = len(data), len(optimized)
+        svglib_before, pygame_before = parse_times(file_path, data)
+        svglib_after, pygame_after = parse_times(file_path, optimized)
+        result.update(svglib_ms_before=svglib_before * 1000, svglib_ms_after=svglib_after * 1000,
+                      pygame_ms_before=pygame_before * 1000, pygame_ms_after=pygame_after * 1000)
+        if len(optimized) < len(data):
+            if not os.path.exists(file_path + ".backup"):
+                make_backup(file_path, data)
+            write_atomic(file_path, optimized)
+            data = optimized
+        else:
+            result["status"] = "unchanged"
+            result["bytes_after"] = len(data)
+        result.update(fingerprint(file_path, data))
+    except Exception as e:
+        result["status"] = "error"
+        result["message"] = str(e)
+        return result
+    
+    result["issues"] = audit_document(SvgDocument(file_path, data))
+    return result
+
+def optimize_svg_paths(paths, workers=None, precision=3):
+    """
+    Optimize SVG files in parallel and print the byte and parse-time savings of each.
+    Returns optimize_svg_file's results in path order.
+    """
+    print(f"Found {len(paths)} SVG files to optimize")
+    manifests = Manifests()
+    results = map_files(partial(optimize_svg_file, precision=precision), paths, workers)
+    for path, result in zip(paths, results):
+        manifests.record(path, result)
+        if result["status"] == "error":
+            print(f"Error optimizing {result['file']}: {result['message']}")
+            continue
+        saved = 1 - result["bytes_after"] / result["bytes_before"] if result["bytes_before"] else 0
+        print(f"{result['file']}: {result['bytes_before']} -> {result['bytes_after']} bytes ({saved:.0%} smaller), "
+              f"svglib {result['svglib_ms_before']:.1f} -> {result['svglib_ms_after']:.1f} ms, "
+              f"pygame {result['pygame_ms_before']:.1f} -> {result['pygame_ms_after']:.1f} ms")
+    manifests.save()
+    
+    done = [result for result in results if result["status"] != "error"]
+    if done:
+        before = sum(result["bytes_before"] for result in done)
+        after = sum(result["bytes_after"] for result in done)
+        print(f"\nOptimization complete! {before} -> {after} bytes, "
+              f"svglib {sum(result['svglib_ms_before'] for result in done):.0f} -> "
+              f"{sum(result['svglib_ms_after'] for result in done):.0f} ms, "
+              f"pygame {sum(result['pygame_ms_before'] for result in done):.0f} -> "
+              f"{sum(result['pygame_ms_after'] for result in done):.0f} ms")
+    return results
+
+def restore_svg_paths(paths):
+    """
+    Move each file's backup back over it and return [{"file", "status", "message"}].
+    Moving is atomic, so a file is either still processed or fully restored.
+    """
+    print(f"Found {len(paths)} backup files to restore")
+    results = []
+    for path in paths:
         try:
-            # Restore from backup
-            with open(backup_path, 'rb') as src_file:
-                with open(original_path, 'wb') as orig_file:
-                    orig_file.write(src_file.read())
-            
-            # Remove backup
-            os.remove(backup_path)
-            
-            restored_files += 1
-            print(f"Restored: {original_path}")
-                
-        except Exception as e:
-            print(f"Error restoring {original_path}: {e}")
+            os.replace(path + '.backup', path)
+            results.append({"file": path, "status": "restored", "message": ""})
+            print(f"Restored: {path}")
+        except OSError as e:
+            results.append({"file": path, "status": "error", "message": str(e)})
+            print(f"Error restoring {path}: {e}")
     
+    restored_files = sum(1 for result in results if result["status"] == "restored")
     print(f"\nRestore complete! Restored: {restored_files}")
-    return restored_files
+    return results
+
+def restore_backups(directory="img/"):
+    """
+    Restore all SVG files from their backups.
+    """
+    if not os.path.exists(directory):
+        print(f"Directory not found: {directory}")
+        return 0
+    
+    results = restore_svg_paths(find_backed_up_files([directory]))
+    return sum(1 for result in results if result["status"] == "restored")
+
+def drawing_to_surface(drawing):
+    """
+    Rasterize an svglib Drawing into a pygame Surface.
+    With the cairo backend its pixel buffer is handed to pygame as it is; any
+    other canvas is encoded to PNG in memory and decoded again instead.
+    """
+    canvas = renderPM.drawToPMCanvas(drawing, backendFmt="RGBA")
+    state = getattr(canvas, "_gs", None)
+    surface = getattr(state, "surface", None)
+    if (surface is None or not hasattr(surface, "get_data") or getattr(state, "_fmt", None) != "ARGB32"
+            or surface.get_stride() != state.width * 4):
+        return canvas_to_png_surface(canvas)
+    surface.flush()
+    # cairo stores native-endian ARGB words; over the opaque background they are not premultiplied
+    pixel_format = "BGRA" if sys.byteorder == "little" else "ARGB"
+    return pygame.image.frombytes(bytes(surface.get_data()), (state.width, state.height), pixel_format)
+
+def canvas_to_png_surface(canvas):
+    bio = io.BytesIO()
+    canvas.saveToFile(bio, "PNG")
+    bio.seek(0)
+    return pygame.image.load(bio, "render.png")
+
+def drawing_to_png_surface(drawing):
+    """Rasterize a Drawing the old way: encode a PNG in memory and decode it again"""
+    return canvas_to_png_surface(renderPM.drawToPMCanvas(drawing))
+
+def load_with_pygame(svg_path):
+    return pygame.image.load(svg_path)
+
+def load_via_png(svg_path):
+    return drawing_to_png_surface(SvgDocument(svg_path).render())
+
+def load_via_pixels(svg_path):
+    return drawing_to_surface(SvgDocument(svg_path).render())
 
-def verify_svg(svg_path):
+# Ways to turn an SVG file into a Surface, compared by benchmark_loaders
+svg_loaders = {"pygame": load_with_pygame, "png": load_via_png, "pixels": load_via_pixels}
+
+def verify_svg(svg_path, via_png=False):
     """
     Verify that an SVG file can be properly loaded and rendered.
     Returns (success, message)
     """
+    return verify_document(SvgDocument(svg_path), via_png)
+
+def verify_document(document, via_png=False):
+    """
+    verify_svg for an SvgDocument, reusing its tree and drawing if it already has them.
+    The drawing is rasterized straight to a Surface unless via_png asks for the PNG round trip.
+    """
     try:
-        # Try parsing as XML
-        tree = ET.parse(svg_path)
-        root = tree.getroot()
-        
-        # Try rendering with svglib
-        drawing = svg2rlg(svg_path)
+        # Try parsing as XML, then rendering with svglib
+        document.parse()
+        drawing = document.render()
         if drawing is None:
             return False, "SVG parsed but cannot be rendered"
             
-        # Try converting to PNG in memory
-        bio = io.BytesIO()
-        renderPM.drawToFile(drawing, bio, fmt="PNG")
-        bio.seek(0)
-        
-        # Try loading as PIL Image
-        img = Image.open(bio)
+        # Try rasterizing the drawing
+        surface = drawing_to_png_surface(drawing) if via_png else drawing_to_surface(drawing)
+        if surface.get_width() == 0 or surface.get_height() == 0:
+            return False, "SVG rendered to an empty image"
         
         return True, "SVG is valid and can be rendered"
         
-    except ET.ParseError as e:
+    except etree.XMLSyntaxError as e:
         return False, f"XML parsing error: {str(e)}"
     except Exception as e:
         return False, f"Error: {str(e)}"
 
-if __name__ == "__main__":
+def verify_svg_file(svg_path):
+    """verify_svg as {"file", "verified", "verify_message"}, for running in a worker process"""
+    success, message = verify_svg(svg_path)
+    return {"file": svg_path, "verified": success, "verify_message": message}
+
+def verify_svg_paths(paths, workers=None):
+    """Verify SVG files in parallel and return verify_svg_file's results in path order"""
+    results = map_files(verify_svg_file, paths, workers)
+    for result in results:
+        print(f"{'Verified' if result['verified'] else 'Failed'}: {result['file']}: {result['verify_message']}")
+    passed = sum(1 for result in results if result["verified"])
+    print(f"Verified: {passed}, Failed: {len(results) - passed}")
+    return results
+
+def time_loader(loader, svg_path, repeat):
+    """Best time of repeat loads in seconds, or the error message if the loader fails"""
+    try:
+        return best_time(lambda: loader(svg_path), repeat)
+    except Exception as e:
+        return str(e)
+
+def benchmark_loaders(directory="img/", repeat=3):
+    """
+    Time every loader in svg_loaders on every SVG in the directory and report the
+    fastest one per file. Returns {file: {loader: seconds, or an error message}}.
+    """
+    if not os.path.exists(directory):
+        print(f"Directory not found: {directory}")
+        return {}
+    
+    results = {}
+    print(f"{'file':<32}" + "".join(f"{name:>10}" for name in svg_loaders) + "   fastest")
+    for svg_file in list_svg_files(directory):
+        svg_path = os.path.join(directory, svg_file)
+        times = {name: time_loader(loader, svg_path, repeat) for name, loader in svg_loaders.items()}
+        results[svg_file] = times
+        timed = {name: t for name, t in times.items() if not isinstance(t, str)}
+        columns = "".join(f"{t * 1000:>8.1f}ms" if name in timed else f"{'failed':>10}" for name, t in times.items())
+        print(f"{svg_file:<32}{columns}   {min(timed, key=timed.get) if timed else '-'}")
+    
+    for name in svg_loaders:
+        errors = {t for times in results.values() for t in [times[name]] if isinstance(t, str)}
+        for error in errors:
+            print(f"{name} failed: {error}")
+    return results
+
+atlas_padding = 1
+
+def atlas_key(name, size=None):
+    """Index key of a sprite: the file name, plus @WxH for a scaled copy"""
+    return f"{name}@{size[0]}x{size[1]}" if size else name
+
+def pack_shelves(sizes, width, padding=atlas_padding):
+    """
+    Place rectangles of the given (w, h) sizes on shelves of the given width, tallest first.
+    Returns ([(x, y)] in the order of sizes, (atlas width, atlas height)).
+    """
+    positions = [None] * len(sizes)
+    x = y = shelf_height = used_width = 0
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0])):
+        w, h = sizes[i]
+        if x + w > width:
+            x, y, shelf_height = 0, y + shelf_height + padding, 0
+        positions[i] = (x, y)
+        x += w + padding
+        used_width = max(used_width, x - padding)
+        shelf_height = max(shelf_height, h)
+    return positions, (used_width, y + shelf_height)
+
+def pack_sprites(sizes, padding=atlas_padding):
+    """pack_shelves at the shelf width that gives the smallest atlas"""
+    area = sum((w + padding) * (h + padding) for w, h in sizes)
+    narrowest = max(w for w, _ in sizes)
+    widths = range(narrowest, max(narrowest, int(2 * area ** 0.5)) + 1, 16)
+    packings = [pack_shelves(sizes, width, padding) for width in widths]
+    return min(packings, key=lambda packing: packing[1][0] * packing[1][1])
+
+def build_atlas(paths, output="img/atlas.png"):
+    """
+    Rasterize SVG files at every size flappy.py draws them and pack them into one
+    image, with a JSON index next to it (output with a .json extension) giving each
+    sprite's rectangle, each file's native size, and the hash of each file so the
+    game can tell stale entries apart. Returns [{"file", "size", "rect"}] for the sprites.
+    Raises ValueError if a file the game draws at a scaled size is not among paths,
+    since the game would quietly rasterize it on every start instead.
+    """
+    missing = sorted(set(drawn_sizes) - {os.path.basename(path) for path in paths})
+    if missing:
+        raise ValueError(f"no atlas entry for sizes the game draws: {', '.join(missing)} not found")
+    directory = os.path.dirname(output)
+    sprites = []
+    sources = {}
+    native_sizes = {}
+    for path in paths:
+        name = os.path.relpath(path, directory).replace(os.sep, "/")
+        with open(path, 'rb') as file:
+            sources[name] = hashlib.sha256(file.read()).hexdigest()
+        # Rasterized and scaled exactly as RasterCache does it for the game
+        image = pygame.image.load(path)
+        native_sizes[name] = list(image.get_size())
+        for size_of in drawn_sizes.get(os.path.basename(path), [native_size]):
+            size = size_of(*image.get_size())
+            if size == image.get_size():
+                sprites.append((name, None, image))
+            else:
+                sprites.append((name, size, pygame.transform.scale(image, size)))
+    
+    positions, atlas_size = pack_sprites([image.get_size() for _, _, image in sprites])
+    atlas = pygame.Surface(atlas_size, pygame.SRCALPHA, 32)
+    results = []
+    rects = {}
+    for (name, size, image), position in zip(sprites, positions):
+        atlas.blit(image, position)
+        rect = [position[0], position[1], image.get_width(), image.get_height()]
+        rects[atlas_key(name, size)] = rect
+        results.append({"file": name, "size": list(image.get_size()), "rect": rect})
+    
+    image_data = io.BytesIO()
+    pygame.image.save(atlas, image_data, os.path.basename(output))
+    write_atomic(output, image_data.getvalue())
+    index = {"image": os.path.basename(output), "sprites": rects, "sizes": native_sizes, "sources": sources}
+    write_atomic(os.path.splitext(output)[0] + ".json", json.dumps(index, indent=1, sort_keys=True).encode())
+    
+    used = sum(image.get_width() * image.get_height() for _, _, image in sprites)
+    print(f"Packed {len(sprites)} sprites from {len(paths)} files into {output} "
+          f"({atlas_size[0]}x{atlas_size[1]}, {used / (atlas_size[0] * atlas_size[1]):.0%} used, "
+          f"{len(image_data.getvalue())} bytes)")
+    return results
+
+def interactive_menu():
     print("SVG Accessibility Utility")
     print("-----------------------")
     print("1. Process SVGs to add accessibility features")
     print("2. Audit SVGs for accessibility issues")
     print("3. Restore SVGs from backups")
     print("4. Verify specific SVG file")
-    print("5. Exit")
+    print("5. Benchmark SVG loaders")
+    print("6. Exit")
     
     while True:
-        choice = input("\nEnter your choice (1-5): ")
+        choice = input("\nEnter your choice (1-6): ")
         
         if choice == "1":
             batch_process_svgs()
@@ -280,7 +1097,103 @@ if __name__ == "__main__":
             print(f"\nVerification result: {'Success' if success else 'Failed'}")
             print(f"Message: {message}")
         elif choice == "5":
+            benchmark_loaders()
+        elif choice == "6":
             print("Exiting...")
             break
         else:
-            print("Invalid choice. Please try again.")
\ No newline at end of file
+            print("Invalid choice. Please try again.")
+
+def summarize(command, results):
+    """(summary counts, exit status) for a command's results; the status is 1 if anything needs attention"""
+    if command == "audit":
+        failing = sum(1 for result in results if result["issues"])
+        return {"files": len(results), "with_issues": failing}, int(failing > 0)
+    if command == "optimize":
+        summary = {"files": len(results)}
+        for result in results:
+            summary[result["status"]] = summary.get(result["status"], 0) + 1
+        done = [result for result in results if result["status"] != "error"]
+        summary["bytes_before"] = sum(result["bytes_before"] for result in done)
+        summary["bytes_after"] = sum(result["bytes_after"] for result in done)
+        return summary, int(summary.get("error", 0) > 0)
+    if command == "atlas":
+        return {"sprites": len(results), "files": len({result["file"] for result in results})}, 0
+    if command == "verify":
+        failing = sum(1 for result in results if not result["verified"])
+        return {"files": len(results), "verified": len(results) - failing, "failed": failing}, int(failing > 0)
+    summary = {"files": len(results)}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    failing = summary.get("error", 0)
+    if command == "process":
+        failing += sum(1 for result in results if result["issues"] or result["verified"] is False)
+    return summary, int(failing > 0)
+
+def run_command(args):
+    if args.command == "process":
+        return process_svg_paths(find_svg_files(args.targets), args.workers, args.verify, not args.full)
+    if args.command == "audit":
+        return audit_svg_paths(find_svg_files(args.targets), args.workers, not args.full)
+    if args.command == "optimize":
+        return optimize_svg_paths(find_svg_files(args.targets), args.workers, args.precision)
+    if args.command == "atlas":
+        return build_atlas(find_svg_files(args.targets), args.output)
+    if args.command == "restore":
+        return restore_svg_paths(find_backed_up_files(args.targets))
+    return verify_svg_paths(find_svg_files(args.targets), args.workers)
+
+def main(argv=None):
+    """
+    Command line entry point; with no command it falls back to the interactive menu.
+    Returns the exit status: 0, or 1 if any file failed or still has issues.
+    """
+    parser = argparse.ArgumentParser(description="SVG accessibility utility")
+    commands = parser.add_subparsers(dest="command")
+    for name, help_text in (("process", "add accessibility features, keeping a backup of each file"),
+                            ("audit", "report accessibility issues"),
+                            ("optimize", "shrink files and report the bytes and parse time saved"),
+                            ("restore", "put files back from their backups"),
+                            ("verify", "check that files parse and render"),
+                            ("atlas", "pack the game's sprites into one image with a JSON index")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("targets", nargs="*", default=["img/"],
+                             help="SVG files, glob patterns or directories (default: img/)")
+        command.add_argument("--report", metavar="PATH",
+                             help="write a JSON report to PATH, or to stdout with -")
+        if name not in ("restore", "atlas"):
+            command.add_argument("--workers", type=int, default=None,
+                                 help="worker processes (default: one per CPU)")
+        if name in ("process", "audit"):
+            command.add_argument("--full", action="store_true",
+                                 help="ignore the manifest and check every file again")
+        if name == "atlas":
+            command.add_argument("--output", default="img/atlas.png",
+                                 help="atlas image to write; the index goes next to it as .json")
+        if name == "optimize":
+            command.add_argument("--precision", type=int, default=3,
+                                 help="decimal places kept in path coordinates (default: 3)")
+        if name == "process":
+            command.add_argument("--verify", action="store_true", help="also verify every processed file")
+    args = parser.parse_args(argv)
+    
+    if args.command is None:
+        interactive_menu()
+        return 0
+    
+    # With the report on stdout, the human-readable output moves to stderr
+    output = sys.stderr if args.report == "-" else sys.stdout
+    with contextlib.redirect_stdout(output):
+        results = run_command(args)
+    summary, status = summarize(args.command, results)
+    
+    if args.report:
+        report = json.dumps({"command": args.command, "summary": summary, "files": results}, indent=1)
+        if args.report == "-":
+            print(report)
+        else:
+            write_atomic(args.report, (report + "\n").encode())
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import os
+import time
+
+import pygame
+
+from fileio import FileWriter
+from raster_cache import RasterCache, max_entry_age
+
+
+square_svg = """<svg xmlns="http://www.w3.org/2000/svg" width="8" height="6">
+<rect width="8" height="6" fill="{}"/></svg>"""
+
+
+def make_svg(tmp_path, color):
+    path = tmp_path / "square.svg"
+    path.write_text(square_svg.format(color))
+    return str(path)
+
+
+def pixel(surface):
+    return tuple(surface.get_at((2, 2)))[:3]
+
+
+def test_second_load_reads_the_cache_entry(tmp_path, monkeypatch):
+    path = make_svg(tmp_path, "#f00")
+    cache = RasterCache(str(tmp_path / "cache"))
+    first = cache.load(path)
+    assert os.path.exists(cache.entry_path(path, None))
+
+    def no_svg_parsing(*args):
+        raise AssertionError("rasterized again instead of reading the cache")
+    monkeypatch.setattr(pygame.image, "load", no_svg_parsing)
+    again = RasterCache(cache.directory).load(path)
+    assert again.get_size() == first.get_size() == (8, 6)
+    assert pixel(again) == (255, 0, 0)
+
+
+def test_changed_file_misses_the_cache(tmp_path):
+    path = make_svg(tmp_path, "#f00")
+    cache = RasterCache(str(tmp_path / "cache"))
+    cache.load(path)
+    old_entry = cache.entry_path(path, None)
+    make_svg(tmp_path, "#00f")
+    os.utime(path, ns=(0, 0))  # Same size, so give it a new mtime even on coarse-timestamp filesystems
+    assert cache.entry_path(path, None) != old_entry
+    assert pixel(cache.load(path)) == (0, 0, 255)
+
+
+def test_each_size_gets_its_own_entry(tmp_path):
+    path = make_svg(tmp_path, "#0f0")
+    writer = FileWriter()
+    cache = RasterCache(str(tmp_path / "cache"), write=writer.write)
+    native = cache.load(path)
+    scaled = cache.load(path, (16, 12))
+    writer.close()
+    assert (native.get_size(), scaled.get_size()) == ((8, 6), (16, 12))
+    entries = {cache.entry_path(path, None), cache.entry_path(path, (16, 12))}
+    assert len(entries) == 2 and all(os.path.exists(entry) for entry in entries)
+    assert RasterCache(cache.directory).read_entry(cache.entry_path(path, (16, 12))).get_size() == (16, 12)
+
+
+def age(path, seconds):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_prune_deletes_only_entries_unused_for_too_long(tmp_path):
+    image = tmp_path / "red.png"
+    surface = pygame.Surface((4, 3))
+    surface.fill((255, 0, 0))
+    pygame.image.save(surface, str(image))
+    cache = RasterCache(str(tmp_path / "cache"))
+    cache.load(str(image))
+    used = cache.entry_path(str(image), None)
+    stale = os.path.join(cache.directory, "0" * 64 + ".rgba")
+    recent = os.path.join(cache.directory, "1" * 64 + ".rgba")
+    leftover = os.path.join(cache.directory, "2" * 64 + ".rgba.tmp")
+    for path in (stale, recent, leftover):
+        with open(path, 'wb') as file:
+            file.write(b"")
+    for path in (used, stale, leftover):
+        age(path, max_entry_age + 60)
+    age(recent, max_entry_age - 60)
+
+    assert cache.prune() == 2
+    assert sorted(os.listdir(cache.directory)) == sorted(os.path.basename(path) for path in (used, recent))
+    # The entry this run used counts as fresh again for the next one
+    assert time.time() - os.path.getmtime(used) < 60
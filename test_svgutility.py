@@ -0,0 +1,134 @@
+import io
+import json
+import os
+import shutil
+
+import pygame
+import pytest
+
+import sprite_sizes
+import svgutility
+
+
+class PngOnlyCanvas():
+    """Stands in for a renderPM canvas whose backend exposes no cairo surface"""
+    def __init__(self, image):
+        self.image = image
+
+    def saveToFile(self, file, fmt):
+        pygame.image.save(self.image, file, "canvas.png")
+
+
+def test_drawing_to_surface_falls_back_to_png(monkeypatch):
+    image = pygame.Surface((3, 2))
+    image.fill((10, 20, 30))
+    monkeypatch.setattr(svgutility.renderPM, "drawToPMCanvas", lambda drawing, **options: PngOnlyCanvas(image))
+    surface = svgutility.drawing_to_surface(None)
+    assert surface.get_size() == (3, 2)
+    assert surface.get_at((1, 1))[:3] == (10, 20, 30)
+
+
+def test_drawing_to_surface_matches_png_path():
+    pytest.importorskip("rlPyCairo")
+    drawing = svgutility.SvgDocument("img/bird1.svg").render()
+    direct = svgutility.drawing_to_surface(drawing)
+    via_png = svgutility.drawing_to_png_surface(drawing)
+    assert direct.get_size() == via_png.get_size()
+    assert pygame.image.tobytes(direct, "RGB") == pygame.image.tobytes(via_png, "RGB")
+
+
+def optimized(svg):
+    document = svgutility.SvgDocument("test.svg", svg.encode())
+    svgutility.optimize_document(document)
+    return document.to_bytes()
+
+
+def rendered(data):
+    return pygame.image.tobytes(pygame.image.load(io.BytesIO(data), "test.svg"), "RGBA")
+
+
+clipped_svg = """<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">
+<defs><clipPath id="c"><rect x="0" y="0" width="20" height="20"/></clipPath></defs>
+<path transform="translate(10,10)" clip-path="url(#c)" d="M0 0 L40 0 L40 40 L0 40 Z" fill="#f00"/>
+</svg>"""
+
+inherited_gradient_svg = """<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">
+<defs><linearGradient id="g" gradientUnits="userSpaceOnUse" x1="0" y1="0" x2="100" y2="0">
+<stop offset="0" stop-color="#f00"/><stop offset="1" stop-color="#00f"/></linearGradient></defs>
+<g fill="url(#g)"><path transform="translate(50,0)" d="M0 0 L40 0 L40 40 L0 40 Z"/><circle cx="5" cy="90" r="4"/></g>
+</svg>"""
+
+
+@pytest.mark.parametrize("svg", [clipped_svg, inherited_gradient_svg], ids=["clip-path", "inherited-gradient"])
+def test_optimize_keeps_transforms_resolved_in_the_paths_coordinates(svg):
+    data = optimized(svg)
+    assert b'transform="translate(' in data
+    assert rendered(data) == rendered(svg.encode())
+
+
+def test_optimize_repoints_stylesheet_references_to_merged_defs():
+    stops = '<stop offset="0" stop-color="#f00"/><stop offset="1" stop-color="#00f"/>'
+    svg = f"""<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100"><style>.a{{fill:url(#g2)}}</style>
+<defs><linearGradient id="g1">{stops}</linearGradient><linearGradient id="g2">{stops}</linearGradient></defs>
+<rect class="a" width="50" height="50"/><rect x="50" width="50" height="50" fill="url(#g1)"/></svg>"""
+    data = optimized(svg)
+    assert b'id="g2"' not in data
+    assert rendered(data) == rendered(svg.encode())
+
+
+def test_optimize_keeps_curves_after_a_relative_subpath():
+    svg = """<svg xmlns="http://www.w3.org/2000/svg" width="200" height="200">
+<path d="M0 0 L10 0 L10 10 Z m100 100 l10 0 l0 10 z C 0 0 50 50 150 150" fill="none" stroke="#000"/></svg>"""
+    data = optimized(svg)
+    assert b"C0 0 50 50 150 150" in data
+    assert rendered(data) == rendered(svg.encode())
+
+
+def test_optimize_folds_plain_translates_without_changing_the_image():
+    svg = """<svg xmlns="http://www.w3.org/2000/svg" width="60" height="60">
+<path transform="translate(10.5,20)" d="M0 0 C3 0 6 0 9 0 L9 9 L0 9 Z" fill="#0a0"/></svg>"""
+    data = optimized(svg)
+    assert b"transform" not in data
+    assert rendered(data) == rendered(svg.encode())
+
+
+def run_report(tmp_path, *argv):
+    report = tmp_path / "report.json"
+    status = svgutility.main([*argv, "--workers", "1", "--report", str(report)])
+    return status, json.loads(report.read_text())
+
+
+def test_process_after_optimize_makes_files_accessible(tmp_path):
+    images = tmp_path / "img"
+    images.mkdir()
+    for name in ["bird1.svg", "pipe.svg"]:
+        shutil.copy(os.path.join("img", name), images / name)
+    status, report = run_report(tmp_path, "optimize", str(images))
+    assert status == 0
+    status, report = run_report(tmp_path, "process", str(images))
+    assert status == 0
+    assert report["summary"].get("processed") == 2
+    status, report = run_report(tmp_path, "audit", str(images))
+    assert status == 0
+    assert report["summary"]["with_issues"] == 0
+
+
+def test_atlas_refuses_to_leave_out_scaled_sprites(tmp_path):
+    paths = [os.path.join("img", "bird1.svg"), os.path.join("img", "start.svg")]
+    with pytest.raises(ValueError, match="trophy.svg"):
+        svgutility.build_atlas(paths, str(tmp_path / "atlas.png"))
+    assert not (tmp_path / "atlas.png").exists()
+
+
+def test_atlas_packs_every_size_the_game_draws(tmp_path):
+    images = tmp_path / "img"
+    shutil.copytree("img", images)
+    output = images / "atlas.png"
+    svgutility.build_atlas(svgutility.find_svg_files([str(images)]), str(output))
+    index = json.loads(output.with_suffix(".json").read_text())
+    for name, sizes in sprite_sizes.drawn_sizes.items():
+        width, height = index["sizes"][name]
+        for size_of in sizes:
+            size = size_of(width, height)
+            key = name if size == (width, height) else svgutility.atlas_key(name, size)
+            assert key in index["sprites"]